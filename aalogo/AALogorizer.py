@@ -1,19 +1,23 @@
 # standard libs
 import os
-import matplotlib
-import matplotlib.pyplot as plt
-from matplotlib.patches import Rectangle
-from matplotlib.offsetbox import (OffsetImage, AnnotationBbox)
-from PIL import Image
-import pandas as pd
-import numpy as np
-from configparser import ConfigParser
-import ast
+import re
+from typing import TYPE_CHECKING
 # intern
+from aalogo import ConfigRegistry
 from aalogo import GetAA
+from aalogo import GlyphCache
 from aalogo import StandardConfig
 from aalogo.StandardConfig import timingmethod
+from aalogo import LogoMetrics
 from aalogo import LogoUtil
+from aalogo import RenderCache
+from aalogo import ScaleRegistry
+
+# numpy, pandas, matplotlib and the stage modules depending on them are imported where a stage runs
+# (counting never loads matplotlib, count_mode never loads pandas) --> fast package import for CLIs and workers
+if TYPE_CHECKING:
+    import pandas as pd
+    from aalogo.SeqCorpus import SequenceCorpus
 
 
 class _AALogoGenerator:
@@ -23,101 +27,104 @@ class _AALogoGenerator:
         self.set_legend = set_legend               # bool value for legend asset
         self.list_columns = list_columns           # shape: [aa_sequence: str, pos_seq: str]
         self.start_pos = start_pos
+        self.report = None                         # rows without window of the last _list_slicer call
 
     # Internal Processes for AAlogo generation
     # __________________________________________________________________________________________________________________
-    def _list_slicer(self, df, length_right, length_left):
+    def _list_slicer(self, df, length_right, length_left, corpus=None):
         """
-        create 2 DataFrames:
-        1. DataFrame with JMD_N / TMD (list_n)
-        2. DataFrame with TMD / JMD_C (list_c)
+        Cuts the sequence windows around the start / stop position of all sequences at once (SeqEngine),
+        1. windows with JMD_N / TMD (start_pos = True)
+        2. windows with TMD / JMD_C (start_pos = False)
+        positions outside of the sequence are padded with gaps
 
         Parameters
         __________
-        df : pandas.DataFrame
-        length_tmd : window size of tmd (number of amino acid residues shown)
-        length_jmd : window size of jmd (number of amino acid residues shown)
+        df : pandas.DataFrame, None --> sequences and anchors of corpus (e.g. memory mapped, SeqCorpus.open_mmap)
+        length_right : window size right of the start/stop position (number of amino acid residues shown)
+        length_left : window size left of the start/stop position (number of amino acid residues shown)
+        corpus : SeqCorpus.SequenceCorpus of df[list_columns[0]] (row order of df), encoded on the fly if None
 
         Returns
         _______
-        list_n : (JMD_N sequence part, TMD sequence part)
-        list_c : (TMD sequence part, JMD_C sequence part)
+        windows : uint8 array (sequences, length_left + length_right) of SeqEngine amino acid codes
         """
-        list_seq_pos = []
-
-        df = df.reset_index()  # make sure indexes pair with number of rows
-
-        for index, row in df.iterrows():
-            if int(row[self.list_columns[1]]) <= 0:
-                print(f"Removed: start position of \n"
-                      f"{row} \n"
-                      f"is less than 1!")
-
-            # N-term
-            elif self.start_pos:
-                start_pos_tmd = int(row[self.list_columns[1]])-1
-                if start_pos_tmd-int(length_left) >= 0:
-                    seq_slice_n = [row[self.list_columns[0]][start_pos_tmd - int(length_left):start_pos_tmd],
-                                   row[self.list_columns[0]][start_pos_tmd:start_pos_tmd + int(length_right)]]
-                else:
-                    seq_slice_n_start_pre = row[self.list_columns[0]][0:start_pos_tmd]
-                    overhang_start = "-"*(int(length_left)-start_pos_tmd)  # "-" take in account shorter seq
-                    seq_slice_n_start = f"{overhang_start}{seq_slice_n_start_pre}"
-                    seq_slice_n = [seq_slice_n_start,
-                                   row[self.list_columns[0]][start_pos_tmd:start_pos_tmd + int(length_right)]]
-                seq_slice_n_check = [LogoUtil.check_input_string(seq) for seq in seq_slice_n]  # check sequence
-                list_seq_pos.append(seq_slice_n_check)
-
-            # C-term
-            else:
-                stop_pos_tmd = int(row[self.list_columns[1]])
-                seq_slice_c = [row[self.list_columns[0]][stop_pos_tmd-int(length_left):stop_pos_tmd],
-                               row[self.list_columns[0]][stop_pos_tmd:stop_pos_tmd + int(length_right)]]
-                seq_slice_c_check = [LogoUtil.check_input_string(seq) for seq in seq_slice_c]
-                list_seq_pos.append(seq_slice_c_check)
+        from aalogo.SeqCorpus import SequenceCorpus
+
+        if df is None:
+            # windows are cut directly from the (mapped) corpus buffers
+            anchors = corpus.anchors[self.list_columns[1]]
+        else:
+            import pandas as pd
+
+            df = df.reset_index()  # make sure indexes pair with number of rows
+
+            # encode the sequence column once, then cut all windows in one gather
+            if corpus is None:
+                corpus = SequenceCorpus.from_dataframe(df, self.list_columns[0])
+            anchors = pd.to_numeric(df[self.list_columns[1]], errors="coerce").to_numpy(dtype=float)
+        windows, kept = corpus.extract_windows(anchors, length_right, length_left, start_pos=self.start_pos)
+        LogoMetrics.count("sequences", windows.shape[0])
+        LogoMetrics.count("windows_dropped", int((~kept).sum()))
+        self.report = _AALogoGenerator._anchor_report(self.list_columns[1], kept)
+        return windows
+
+    @staticmethod
+    def _anchor_report(column: str, kept, max_rows: int = 10):
+        """
+        Rows without window (start position < 1 or missing, rejected sequence), one summary line instead of a
+        message per row
+
+        Returns
+        _______
+        dict_report : {"removed": number of rows, "rows": int64 array of the row indices}
+        """
+        import numpy as np
 
-        return list_seq_pos
+        rows = np.flatnonzero(~kept)
+        if rows.size:
+            print(f"Removed: {rows.size} rows of {column} (start position less than 1, missing or rejected "
+                  f"sequence), rows {rows[:max_rows].tolist()}{' ...' if rows.size > max_rows else ''}")
+        return {"removed": int(rows.size), "rows": rows}
 
     @staticmethod
-    def _data_frame_aa_propensities(list_seq_pos, length_right, length_left, aa_list):
+    def _data_frame_aa_propensities(counts, aa_list):
         """
         Position resolved propensities of amino acids of all sequences
 
         Parameters
         __________
-        list_n_or_c : return list from list_slicer, has amino acid sequence of both domains as list
-        length_tmd : window size of tmd (number of amino acid residues shown)
-        length_jmd : window size of jmd (number of amino acid residues shown)
+        counts : count matrix of the windows from _list_slicer (SeqEngine.count_windows)
         aa_list : order of the amino acids (assigned by the LogoStyle.ini file), from top to bottom
 
         Returns
         _______
-        aa_propensity_df : creates dataframe with the propensity of the amino acids (from 0 to 1 normalized)
+        aa_propensity_df : creates dataframe with the propensity of the amino acids (from 0 to 1 normalized),
+                           index = aa_list, columns = window positions (1 to length_left + length_right)
         """
+        import numpy as np
+        import pandas as pd
 
-        list_concat = []
-        for items in list_seq_pos:
-            list_concat.append(f"{items[0]}{items[1]}")
-        df_intermediate = (pd.Series(list_concat).str.split(r"", expand=True)
-                           .drop([0, length_left + length_right + 1], axis=1))
-        df_intermediate.replace("-", None, inplace=True)
-
-        aa_list_transform = [aa_list]
-        for slices in df_intermediate:
-            aa_20 = []
-            list_aa_slice = df_intermediate[slices].to_numpy().tolist()
-            len_slice = len(list_aa_slice)
-            for AA in aa_list:
-                aa_20.append(list_aa_slice.count(AA)/len_slice)  # before df_intermediate
-            aa_list_transform.append(aa_20)
-        aa_propensity_df = pd.DataFrame(aa_list_transform, columns=aa_list).transpose().drop(0, axis=1)
+        matrix = _AALogoGenerator._aa_propensities(counts, aa_list)
+        aa_propensity_df = pd.DataFrame(matrix, index=list(aa_list), columns=np.arange(1, counts.shape[1] + 1))
         return aa_propensity_df
+
+    @staticmethod
+    def _aa_propensities(counts, aa_list):
+        """
+        Propensity matrix (rows = aa_list, columns = window positions) of a count matrix, without pd.DataFrame
+        """
+        from aalogo import SeqEngine
+        return SeqEngine.propensities(counts)[SeqEngine.aa_codes(aa_list)]
     # __________________________________________________________________________________________________________________
 
+    @timingmethod
     def _make_logo(self, df, name: str, length_right: int, length_left: int,
                    aa_config_section_name: str = "OG_AA_config", font_type: str = "bold_AA_fonts",
                    config_set: bool = True, color_grad: list = None, order_aa_grad: list = None,
-                   color_advance: list = None, list_title_sides: list = None):
+                   color_advance: list = None, list_title_sides: list = None, corpus=None,
+                   backend: str = "artist", file_format: str = "png", output_dir: str = None, counts=None,
+                   glyph_set=None):
         """
         Generates the final plot/logo
 
@@ -135,35 +142,96 @@ class _AALogoGenerator:
         order_aa_grad : ordering amino acids for gradient function
         color_advance : int or float values which are normalized and applied to the color gradient
         list_title_sides : list of the titles for both sides of the plot (separated by the start/stop position)
+        corpus : encoded sequences of df (SeqCorpus.SequenceCorpus), reused across calls if given
+        backend : "artist" --> one AnnotationBbox per letter
+                  "raster" --> all letters composited into one image (LogoRender), much faster for wide windows
+                  "vector" --> letters drawn as font outlines (LogoRender), for lightweight .svg / .pdf output
+        file_format : output file type, png, svg or pdf
+        output_dir : directory of the logo files (str or os.PathLike), None --> "output" folder in the current directory
+        counts : precomputed count matrix (SeqEngine.count_windows, e.g. from SeqStream), df is not used if given
+        glyph_set : precomputed GetAA.aa_image_colorizer output of the same style, shared by several logos
+
+        Returns
+        _______
+        path_logo : path of the saved logo
         """
 
+        import numpy as np
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.font_manager import FontProperties
+        from matplotlib.patches import Rectangle
+        from matplotlib.offsetbox import (OffsetImage, AnnotationBbox)
+        from aalogo import LogoRender
+        from aalogo import SeqEngine
+
         path_current, sep = StandardConfig.find_folderpath()
-        path_file = os.path.abspath(os.path.dirname(__file__))
 
-        assets_path = f"{path_file.split("aalogo")[0]}fonts{sep}AA_letters_common{sep}"
+        if counts is None:
+            with LogoMetrics.span("slice"):
+                windows = _AALogoGenerator._list_slicer(self, df, length_right, length_left, corpus=corpus)
+            with LogoMetrics.span("count"):
+                counts = SeqEngine.count_windows(windows)
+        elif np.shape(counts) != (SeqEngine.N_CODES, length_right + length_left):
+            raise ValueError(f"counts of shape {np.shape(counts)} do not match the window size "
+                             f"{length_left} + {length_right}")
 
-        list_seq_pos = _AALogoGenerator._list_slicer(self, df, length_right, length_left)
-        # get the necessary dataframes and image lists for AAlogo generation
+        # last naming differentiation depending on start/stop position (make better)
+        if self.start_pos:
+            start_tag = "set_start_true"
+        else:
+            start_tag = "set_start_false"
+        if output_dir is None:
+            StandardConfig.make_directory(f"output")
+            output_dir = f"{path_current}{sep}output"
+        else:
+            os.makedirs(output_dir, exist_ok=True)
+        path_logo = f"{output_dir}{sep}{name}_{start_tag}.{file_format}"
+        # unchanged logo (same counts, style, config and fonts) --> copy it from the render cache, skip the drawing
+        render_cache = RenderCache.active_cache()
+        if render_cache is not None:
+            config = ConfigRegistry.get_config(aa_config_section_name) if config_set else None
+            dict_style = {"length": [length_left, length_right], "start_pos": self.start_pos,
+                          "set_legend": self.set_legend, "font_type": font_type, "config": config,
+                          "background": ConfigRegistry.background_style(), "color_grad": color_grad,
+                          "order_aa_grad": None if order_aa_grad is None else list(order_aa_grad),
+                          "color_advance": None if color_advance is None else list(color_advance),
+                          "titles": list_title_sides, "backend": backend, "file_format": file_format}
+            with LogoMetrics.span("cache_lookup"):
+                cache_key = render_cache.key(counts, dict_style, font_type)
+                cache_hit = render_cache.fetch(cache_key, path_logo)
+                LogoMetrics.count("cache_hits" if cache_hit else "cache_misses")
+            if cache_hit:
+                return path_logo
+
+        # get the necessary propensities and image lists for AAlogo generation
         # ______________________________________________________________________________________________________________
-        get_aa_list = GetAA.aa_image_colorizer(aa_config_section_name, font_type, config_set, color_grad,
-                                               order_aa_grad, color_advance)
-        df_propensity = _AALogoGenerator._data_frame_aa_propensities(list_seq_pos, length_right, length_left,
-                                                                     get_aa_list[1])
-
-        # matplotlib.pyplot based visualization
+        get_aa_list = glyph_set
+        if get_aa_list is None:
+            with LogoMetrics.span("colorize"):
+                get_aa_list = GetAA.aa_image_colorizer(aa_config_section_name, font_type, config_set, color_grad,
+                                                       order_aa_grad, color_advance)
+        matrix_propensity = _AALogoGenerator._aa_propensities(counts, get_aa_list[1])   # rows top to bottom
+
+        # matplotlib based visualization
         # ______________________________________________________________________________________________________________
-        matplotlib.rcParams["axes.linewidth"] = 3
-        font = {"weight": "bold",
-                "size": 18}
-        matplotlib.rc("font", **font)
+        # explicit Figure + Agg canvas instead of pyplot: no global figure manager keeps the figure alive and
+        # styles are set on the artists instead of the global rcParams --> safe to render from several threads
+        font = FontProperties(weight="bold", size=18)       # also the AnnotationBbox padding unit
 
         # matplotlib implementation
-        fig, ax = plt.subplots(dpi=254)
+        fig = Figure(dpi=254)
+        FigureCanvasAgg(fig)
         fig.set_size_inches((length_right + length_left)*2, 10, forward=True)  # 1 inch = 100 pixels
+        ax = fig.subplots()
 
         ax.set_xlim(-length_left-0.5, length_right-0.5)
         ax.set_ylim(0, 1)
         ax.set_xticks(np.arange(-length_left, length_right, 1))
+        for spine in ax.spines.values():
+            spine.set_linewidth(3)
+        for tick_label in ax.get_xticklabels() + ax.get_yticklabels():
+            tick_label.set_fontproperties(font)     # ticks added while drawing copy the first tick
 
         # define the figure
         ax.set_xlabel("sequence position", fontsize=18, weight="bold")
@@ -178,22 +246,14 @@ class _AALogoGenerator:
         color_gradient = None
 
 
-        config_file = f"{path_file}{sep}LogoStyle.ini"
-        config = ConfigParser()
-        config.read(config_file)
-        config.sections()
-
-        # get color codes if mentioned
-        bg_style = list(config["bg_style"])
-
-        if bg_style[0] == "tmd":
-            r, g, b = ast.literal_eval(config["bg_style"][bg_style[0]])
-            color_tmd = LogoUtil.rgb_to_hex(r, g, b)                            # hex
-        if bg_style[1] == "jmd":
-            r, g, b = ast.literal_eval(config["bg_style"][bg_style[1]])
-            color_jmd = LogoUtil.rgb_to_hex(r, g, b)                            # hex
-        if bg_style[2] == "gradient":
-            color_gradient = ast.literal_eval(config["bg_style"][bg_style[2]])  # list with rgb values
+        # get color codes if mentioned ([bg_style] of the ConfigRegistry)
+        background = ConfigRegistry.background_style()
+        if background.tmd is not None:
+            color_tmd = LogoUtil.rgb_to_hex(*background.tmd)                   # hex
+        if background.jmd is not None:
+            color_jmd = LogoUtil.rgb_to_hex(*background.jmd)                   # hex
+        if background.gradient is not None:
+            color_gradient = list(background.gradient)                         # list with rgb values
 
         # generates the background with the gradient png on top
         # is it a start position or a stop position (important differentiation)
@@ -203,12 +263,13 @@ class _AALogoGenerator:
 
             # right gradient
             if color_gradient is not list:
-                img = Image.open(f"{assets_path}white_r_grad.png")
+                img = GlyphCache.get_glyph("AA_letters_common", "white_r_grad")
             else:
-                img = LogoUtil.convert_image_color(assets_path, "white_r_grad", tuple(color_gradient))
+                img = GlyphCache.get_glyph("AA_letters_common", "white_r_grad", tuple(color_gradient))
             imagebox = OffsetImage(img, zoom=0.554)
             # box_alignment position is upper middle of picture
-            r_grad = AnnotationBbox(imagebox, xy=(-0.5, 0), box_alignment=(1, 0), frameon=False)
+            r_grad = AnnotationBbox(imagebox, xy=(-0.5, 0), box_alignment=(1, 0), frameon=False,
+                                    fontsize=font.get_size())
             imagebox.image.axes = ax
             ax.add_artist(r_grad)
 
@@ -218,12 +279,13 @@ class _AALogoGenerator:
 
             # left gradient
             if color_gradient is not list:
-                img = Image.open(f"{assets_path}white_l_grad.png")
+                img = GlyphCache.get_glyph("AA_letters_common", "white_l_grad")
             else:
-                img = LogoUtil.convert_image_color(assets_path, "white_l_grad", tuple(color_gradient))
+                img = GlyphCache.get_glyph("AA_letters_common", "white_l_grad", tuple(color_gradient))
             imagebox = OffsetImage(img, zoom=0.554)
             # box_alignment position is upper middle of picture
-            l_grad = AnnotationBbox(imagebox, xy=(-0.5, 0), box_alignment=(0, 0), frameon=False)
+            l_grad = AnnotationBbox(imagebox, xy=(-0.5, 0), box_alignment=(0, 0), frameon=False,
+                                    fontsize=font.get_size())
             imagebox.image.axes = ax
             ax.add_artist(l_grad)
 
@@ -256,57 +318,151 @@ class _AALogoGenerator:
                 imagebox = OffsetImage(index_image, zoom=0.3)
                 # AnnotationBbox for translation
                 # box_alignment position is upper middle of picture
-                index_box = AnnotationBbox(imagebox, xy=(x, y), box_alignment=(-0.6, 0.35), frameon=False)
+                index_box = AnnotationBbox(imagebox, xy=(x, y), box_alignment=(-0.6, 0.35), frameon=False,
+                                           fontsize=font.get_size())
                 imagebox.image.axes = ax
                 ax.add_artist(index_box)
                 ax.text(x+0.51, y, index_text_string, fontsize=14, weight="bold")
                 i = i-0.05
 
         # add the AA letters
-        for columns in df_propensity:
-            i = 0
-            concat_distance = 0
-            aa_pos_column_list = df_propensity[columns].tolist()
-            while i < len(df_propensity):
-                concat_distance += aa_pos_column_list[i]
-                # Python program to change the ratio of height and width of an image
-                # Taking image as input
-                if aa_pos_column_list[i] > 0:
-                    img = get_aa_list[0][i][1]
-                    # Changing the height and width of the image
-                    factor = aa_pos_column_list[i]  # get info from dataframe!
-                    width = 110
-                    height = int(554*factor)+1  # conserved height
-                    # Resizing the image
-                    img = img.resize((width, height))
-                    # important for converting it into an usable format for AnnotationBbox
-                    imagebox = OffsetImage(img, zoom=1)
-                    # AnnotationBbox for translation
-                    # box_alignment position is upper middle of picture
-                    ab = AnnotationBbox(imagebox, xy=(columns - (length_left+1), 1-concat_distance),
-                                        box_alignment=(0.5, 0), frameon=False)
-                    imagebox.image.axes = ax
-                    ax.add_artist(ab)
-                i += 1
-
-        # last naming differentiation depending on start/stop position (make better)
-        if self.start_pos:
-            start_tag = "set_start_true"
-        else:
-            start_tag = "set_start_false"
-        StandardConfig.make_directory(f"output")
-        plt.savefig(f"{path_current}{sep}output{sep}{name}_{start_tag}.png", bbox_inches='tight', dpi=400)
+        with LogoMetrics.span("letters", backend=backend):
+            LogoMetrics.count("glyphs", np.count_nonzero(matrix_propensity))
+            if backend == "raster":
+                # all letters composited into one canvas at output resolution (LogoRender), drawn as one image
+                ax.add_artist(LogoRender.LetterStack(matrix_propensity, [entries[1] for entries in get_aa_list[0]],
+                                                     x_start=-length_left-0.5))
+            elif backend == "vector":
+                # letters as scaled font outlines (LogoRender), file size and quality independent of the dpi
+                ax.add_collection(LogoRender.vector_letter_stack(matrix_propensity, get_aa_list[1],
+                                                                 [entries[2] for entries in get_aa_list[0]],
+                                                                 x_start=-length_left-0.5, font_type=font_type),
+                                  autolim=False)
+            else:
+                for columns, aa_pos_column_list in enumerate(matrix_propensity.T.tolist(), start=1):
+                    i = 0
+                    concat_distance = 0
+                    while i < len(aa_pos_column_list):
+                        concat_distance += aa_pos_column_list[i]
+                        # Python program to change the ratio of height and width of an image
+                        # Taking image as input
+                        if aa_pos_column_list[i] > 0:
+                            aa, img, rgb = get_aa_list[0][i]
+                            # Changing the height and width of the image
+                            factor = aa_pos_column_list[i]  # get info from propensity matrix!
+                            width = 110
+                            height = int(554*factor)+1  # conserved height
+                            # Resizing the image (memoized per glyph, color and height, GlyphCache.GlyphLadder)
+                            img = GlyphCache.get_scaled(font_type, aa, rgb, (width, height), img)
+                            # important for converting it into an usable format for AnnotationBbox
+                            imagebox = OffsetImage(img, zoom=1)
+                            # AnnotationBbox for translation
+                            # box_alignment position is upper middle of picture
+                            ab = AnnotationBbox(imagebox, xy=(columns - (length_left+1), 1-concat_distance),
+                                                box_alignment=(0.5, 0), frameon=False, fontsize=font.get_size())
+                            imagebox.image.axes = ax
+                            ax.add_artist(ab)
+                        i += 1
+
+        try:
+            with LogoMetrics.span("save", file_format=file_format):    # raster letters are composited here
+                fig.savefig(path_logo, bbox_inches='tight', dpi=400)
+        finally:
+            fig.clear()                             # release artists and image buffers right away
+        if render_cache is not None:
+            render_cache.store(cache_key, path_logo)
+        return path_logo
 
 
 class AAlogoMaker:
 
-    def __init__(self, df: pd.DataFrame, name: str, column_seq: str, *args_position: str):
-        self.df = df
+    def __init__(self, df: "pd.DataFrame", name: str, column_seq: str, *args_position: str,
+                 corpus: "SequenceCorpus" = None, policy: str = "mask"):
+        self.df = df                            # None --> sequences and anchor columns of the corpus
         self.name = name
         self.column_seq = column_seq
         self.args_position = args_position
+        self.corpus = corpus                    # encoded df[column_seq], built once on first use
+        self.policy = policy                    # residues that are no amino acids: "mask", "drop" or "raise"
+        self.report = None                      # {"sequences": validation report, "anchors": {column: report}}
+
+    def _get_corpus(self):
+        from aalogo.SeqCorpus import SequenceCorpus
+
+        if self.corpus is None:
+            self.corpus = SequenceCorpus.from_dataframe(self.df, self.column_seq, policy=self.policy)
+            report = self.corpus.report
+            if report["rejected"] or report["masked_residues"]:
+                print(f"Sequences: {report['rejected']} rejected ({report['reasons']['not_str']} not str), "
+                      f"{report['masked_residues']} residues masked as gaps, not allowed: {report['characters']}")
+        elif self.df is not None and len(self.corpus) != len(self.df):
+            raise ValueError(f"corpus has {len(self.corpus)} sequences, pd.DataFrame has {len(self.df)} rows")
+        return self.corpus
+
+    def _anchor_values(self, column: str):
+        """
+        Alignment positions of an anchor column (pd.DataFrame column, else anchors stored in the corpus)
+        """
+        if self.df is None:
+            return self.corpus.anchors[column]
+        import pandas as pd
+
+        return pd.to_numeric(self.df[column], errors="coerce").to_numpy(dtype=float)
+
+    def _group_codes(self, group_by: str):
+        """
+        Group code per row of a categorical column (rows without group --> -1)
+
+        Returns
+        _______
+        groups : int64 array (rows), index into labels
+        labels : sorted group labels
+        """
+        import numpy as np
+
+        if self.df is None:
+            # corpus without pd.DataFrame (e.g. mapped by LogoBatch.map_inputs), groups stored with the sequences
+            if group_by not in self.corpus.groups:
+                raise ValueError(f"{group_by} not in the group columns of the corpus {list(self.corpus.groups)}")
+            groups, labels = self.corpus.groups[group_by]
+            return np.asarray(groups, dtype=np.int64), list(labels)
+        import pandas as pd
+
+        if group_by not in self.df.columns:
+            raise ValueError(f"{group_by} not in pd.DataFrame.columns")
+        groups, labels = pd.factorize(self.df[group_by], sort=True)
+        return groups.astype("int64"), labels.tolist()
+
+    @staticmethod
+    def _group_names(labels: list):
+        """
+        File name part per group label, labels that are equal after replacing the characters not allowed in file
+        names (e.g. "a/b" and "a b" --> "a_b") get a short hash of the label appended
+
+        Returns
+        _______
+        list_names : unique names, same order as labels (None --> no group, "")
+        """
+        import hashlib
+        from collections import Counter
+
+        list_names = ["" if label is None else "_" + re.sub(r"[^\w.-]+", "_", str(label)) for label in labels]
+        counter = Counter(list_names)
+        list_names = [f"{name}_{hashlib.sha256(str(label).encode()).hexdigest()[:8]}" if counter[name] > 1 else name
+                      for name, label in zip(list_names, labels)]
+        if len(set(list_names)) < len(list_names):
+            raise ValueError(f"group labels {labels} do not give unique file names")
+        return list_names
 
     def _check_self(self):
+        # corpus without pd.DataFrame (e.g. SequenceCorpus.open_mmap), anchors are stored with the sequences
+        if self.df is None and self.corpus is not None:
+            for arg_pos in self.args_position:
+                if arg_pos not in self.corpus.anchors:
+                    raise ValueError(f"{arg_pos} not in the anchor columns of the corpus {list(self.corpus.anchors)}")
+            return
+        import pandas as pd
+
         # check df
         if not isinstance(self.df, pd.DataFrame):
             raise TypeError("needs to be pd.DataFrame")
@@ -320,17 +476,25 @@ class AAlogoMaker:
 
     @staticmethod
     def _check_function_inputs(dict_input):
-        path_current, sep = StandardConfig.find_folderpath()
-        path_file = os.path.abspath(os.path.dirname(__file__))
+        import numpy as np
 
         dict_exchange = {"start_pos": True, "aa_right": 5, "aa_left": 5, "font_type": "bold_AA_fonts",
-                         "custom_color": None, "config_name": None, "headers": None}
+                         "custom_color": None, "config_name": None, "headers": None, "backend": "artist",
+                         "file_format": "png", "output_dir": None, "group_by": None, "max_workers": 1}
 
         # simple checking of variables
         # ______________________________________________________________________________________________________________
         dict_typing = {"start_pos": bool, "aa_right": int, "aa_left": int, "font_type": str,
-                       "custom_color": list, "config_name": str, "headers": list}
+                       "custom_color": list, "config_name": str, "headers": list, "backend": str,
+                       "file_format": str, "output_dir": str, "group_by": str, "max_workers": int}
         dict_input_keys = dict_input.keys()
+        # output_dir: path like objects (e.g. pathlib.Path) as str, other types are not replaced by ./output
+        if dict_input.get("output_dir") is not None:
+            if isinstance(dict_input["output_dir"], os.PathLike):
+                dict_input["output_dir"] = os.fspath(dict_input["output_dir"])
+            if not isinstance(dict_input["output_dir"], str):
+                raise TypeError(f"output_dir needs to be str or os.PathLike, "
+                                f"got {type(dict_input['output_dir']).__name__}")
         for keys in dict_input_keys:
             if not isinstance(dict_input[keys], dict_typing[keys]):
                 dict_input[keys] = dict_exchange[keys]
@@ -357,20 +521,127 @@ class AAlogoMaker:
                                 ValueError(f"custom_colors needs to have the following shape: [[r1,g1,b1],[r1,g1,b1]],"
                                            f"where r,g,b is int or float")
 
+        if "backend" in dict_input_keys:
+            if dict_input["backend"] not in ["artist", "raster", "vector"]:
+                print(f"{dict_input['backend']} is not a render backend (artist, raster, vector), artist is used")
+                dict_input["backend"] = "artist"
+
+        if "file_format" in dict_input_keys:
+            if dict_input["file_format"] not in ["png", "svg", "pdf"]:
+                print(f"{dict_input['file_format']} is not a supported file format (png, svg, pdf), png is used")
+                dict_input["file_format"] = "png"
+
         if "headers" in dict_input_keys:
             if dict_input["headers"] is not None:
                 if np.array(dict_input["headers"]).shape != (2,):
                     raise ValueError(f"headers must bei [left_side_title, right_side_title] in shape!")
 
         if "config_name" in dict_input_keys:
-            config_file = f"{path_file}{sep}LogoStyle.ini"
-            config = ConfigParser()
-            config.read(config_file)
-            config_sections = config.sections()
-            if dict_input["config_name"] not in config_sections:
+            if dict_input["config_name"] not in ConfigRegistry.config_names():
                 dict_input["config_name"] = None
+
+        if "max_workers" in dict_input_keys:
+            if dict_input["max_workers"] < 1:
+                print(f"{dict_input['max_workers']} is below the minimal number of workers (min = 1), 1 is used")
+                dict_input["max_workers"] = 1
         return dict_input
 
+    @staticmethod
+    def _style_options(config_name, theme):
+        """
+        Amino acid order and coloring of a logo, config is always dominant if config_name is given!
+
+        Returns
+        _______
+        config_set : True if a LogoStyle.ini color configuration is used
+        order_aa_grad : amino acid order of the gradient theme (None with config)
+        color_advance : scale values of the gradient theme (None with config)
+        set_legend : legend of the color categories (config only)
+        available_themes : all sorting options (ScaleRegistry)
+        """
+        config_set = config_name is not None
+
+        # get AA order / theme for AAlogo (presorted by the ScaleRegistry, no file access after the first call)
+        # ______________________________________________________________________________________________________________
+        dict_theme = ScaleRegistry.get_theme(theme)
+        order_aa_grad = dict_theme["order"]
+        color_advance = dict_theme["values"]         # normalized by GetAA
+        set_legend = False
+        if config_set:
+            order_aa_grad, color_advance = None, None
+            set_legend = True
+        available_themes = ScaleRegistry.available_themes()
+        return config_set, order_aa_grad, color_advance, set_legend, available_themes
+
+    def _anchor_logos(self, list_anchors: list, dict_inputs: dict, config_set: bool, order_aa_grad: list,
+                      color_advance: list, set_legend: bool, custom_colors: list = None, theme: str = None):
+        """
+        Logos of several anchor columns, the count matrices of all anchors (and groups) come from one pass over the
+        encoded sequences (SeqCorpus.count_anchor_sets) and all logos are drawn with the same glyph set
+
+        Parameters
+        __________
+        list_anchors : [(anchor column, start_pos, aa_right, aa_left, headers)], one entry per logo
+        dict_inputs : checked inputs (_check_function_inputs), group_by --> one logo per anchor column and group,
+                      max_workers --> number of processes drawing the logos (1 --> in this process)
+        theme : gradient theme of the logos (glyphs shared with the worker processes, GlyphAtlas.style_keys)
+
+        Returns
+        _______
+        list_paths : paths of the saved logos (order of list_anchors, groups in sorted order within an anchor)
+        """
+        import numpy as np
+
+        corpus = self._get_corpus()
+        group_by = dict_inputs.get("group_by")
+        groups, labels = (None, [None]) if group_by is None else self._group_codes(group_by)
+        anchor_sets = np.stack([self._anchor_values(column) for column, *_ in list_anchors])
+        with LogoMetrics.span("count", anchors=len(list_anchors), groups=len(labels)):
+            counts, kept = corpus.count_anchor_sets(anchor_sets, [entry[2] for entry in list_anchors],
+                                                    [entry[3] for entry in list_anchors],
+                                                    [entry[1] for entry in list_anchors], groups=groups,
+                                                    n_groups=None if groups is None else len(labels))
+            LogoMetrics.count("sequences", int(kept.sum()))
+            LogoMetrics.count("windows_dropped", int((~kept).sum()))
+        self.report = {"sequences": corpus.report,
+                       "anchors": {column: _AALogoGenerator._anchor_report(column, kept_column)
+                                   for (column, *_), kept_column in zip(list_anchors, kept)}}
+        if groups is None:
+            counts = counts[:, None]            # one logo per anchor column
+        else:
+            n_removed = int((groups < 0).sum())
+            if n_removed:
+                print(f"Removed: {n_removed} rows without {group_by} group")
+            self.report["groups"] = {"column": group_by, "labels": labels, "removed": n_removed,
+                                     "sizes": np.bincount(groups[groups >= 0], minlength=len(labels))}
+
+        with LogoMetrics.span("colorize"):
+            glyph_set = GetAA.aa_image_colorizer(dict_inputs["config_name"], dict_inputs["font_type"], config_set,
+                                                 custom_colors, order_aa_grad, color_advance)
+
+        list_logos = []
+        list_group_names = self._group_names(labels)            # group labels, safe in file names
+        for (column, start_pos, aa_right, aa_left, headers), counts_anchor in zip(list_anchors, counts):
+            for group_name, counts_logo in zip(list_group_names, counts_anchor):
+                name = str(self.name) + group_name
+                list_logos.append({"set_legend": set_legend, "list_columns": [self.column_seq, column],
+                                   "start_pos": start_pos, "name": name, "length_right": aa_right,
+                                   "length_left": aa_left, "font_type": dict_inputs["font_type"],
+                                   "config_set": config_set, "aa_config_section_name": dict_inputs["config_name"],
+                                   "order_aa_grad": order_aa_grad, "color_advance": color_advance,
+                                   "list_title_sides": headers, "color_grad": custom_colors,
+                                   "backend": dict_inputs["backend"], "file_format": dict_inputs["file_format"],
+                                   "output_dir": dict_inputs["output_dir"], "counts": counts_logo})
+
+        max_workers = dict_inputs.get("max_workers", 1)
+        if max_workers == 1 or len(list_logos) < 2:
+            return [_draw_logo({**dict_logo, "glyph_set": glyph_set}) for dict_logo in list_logos]
+
+        from aalogo import GlyphAtlas
+
+        glyph_keys = GlyphAtlas.style_keys(dict_inputs["font_type"], dict_inputs["config_name"], theme, custom_colors)
+        return _draw_logos_parallel(list_logos, max_workers, glyph_keys)
+
     @staticmethod
     def help():
         print("""
@@ -378,10 +649,13 @@ class AAlogoMaker:
         ___________
         AAlogoMaker is meant to ease the usage of AALogoGenerator
                         ________________________________________________________________________________________________
-                        df: pd.DataFrame, name: str, column_seq: str, *args_position: str
+                        df: pd.DataFrame, name: str, column_seq: str, *args_position: str,
+                        corpus: SequenceCorpus = None
                         df --> needs to contain the amino acid sequences = column_seq
                            --> needs at least one *args_position = name of column with alignment positions for 
                                sequences in column_seq
+                        corpus --> optional pre-encoded column_seq (SeqCorpus.SequenceCorpus, same row order as
+                                   df), e.g. SequenceCorpus.load(path) to skip encoding the sequences again
                         ________________________________________________________________________________________________
                         
         Callable Functions
@@ -390,19 +664,39 @@ class AAlogoMaker:
                         ________________________________________________________________________________________________
                         start_pos: bool = True, aa_right: int = 5, aa_left: int = 5, font_type: str = "bold_AA_fonts",
                         theme: str = "Kyte-Doolittle", custom_colors: list = None, config_name: str = None,
-                        headers: list = None
+                        headers: list = None, backend: str = "artist", file_format: str = "png",
+                        output_dir: str = None, group_by: str = None, max_workers: int = 1
                         ________________________________________________________________________________________________
         tmd_mode() : application for sequence-propensity visualization based on start and stop position of a tmd 
                      (usage for transmembrane proteins)
                      ___________________________________________________________________________________________________
                      start_pos: bool = True, aa_jmd: int = 5, aa_tmd: int = 5, font_type: str = "bold_AA_fonts",
                      theme: str = "Kyte-Doolittle", custom_colors: list = None, config_name: str = None,
-                     headers: list = None
+                     headers: list = None, backend: str = "artist", file_format: str = "png",
+                     output_dir: str = None, group_by: str = None, max_workers: int = 1
                      ___________________________________________________________________________________________________
+        count_mode() : static, logo of a precomputed count matrix (SeqStream.fasta_counts / table_counts), e.g. for
+                       FASTA files too large for a pd.DataFrame
+                       _________________________________________________________________________________________________
+                       counts, name: str, start_pos: bool = True, aa_right: int = 5, aa_left: int = 5, ...
+                       (same styling arguments as single_mode), counts need aa_left + aa_right positions
+                       _________________________________________________________________________________________________
         
         Note
         ____
         Inputting a config setting is dominant over a gradient setting!
+
+        Groups
+        ______
+        group_by="family" --> one logo per value of the pd.DataFrame column "family" (<name>_<group>_set_start_...),
+                              all groups are counted in one pass and drawn with the same glyph set
+        max_workers=4 --> the logos are drawn by 4 worker processes (1 --> in this process)
+
+        Backend
+        _______
+        "artist" --> every letter is its own matplotlib artist (default)
+        "raster" --> all letters are composited into one image, much faster for wide windows
+        "vector" --> letters are drawn as font outlines, use with file_format="svg" or "pdf" for small vector files
         
         Config
         ______
@@ -416,105 +710,60 @@ class AAlogoMaker:
         Basic = ["H,K,R", [60,60,224]]
         Special = ["P,G", [50,50,50]]
         Cysteine = ["C", [224,90,224]]
+        ConfigRegistry.register_config(path or dict, name=None)
+        --> adds own configs without changing LogoStyle.ini
         
         Gradient
         ________
-        AAlogo_Util.single_mode().available_themes
+        ScaleRegistry.available_themes()
         --> see all available scale-themes
         """)
 
     @timingmethod
     def single_mode(self, start_pos: bool = True, aa_right: int = 5, aa_left: int = 5, font_type: str = "bold_AA_fonts",
                     theme: str = "Kyte-Doolittle", custom_colors: list = None, config_name: str = None,
-                    headers: list = None):
+                    headers: list = None, backend: str = "artist", file_format: str = "png",
+                    output_dir: str = None, group_by: str = None, max_workers: int = 1):
 
         # check inputs
         # ______________________________________________________________________________________________________________
         AAlogoMaker._check_self(self)
         dict_inputs = {"start_pos": start_pos, "aa_right": aa_right, "aa_left": aa_left, "font_type": font_type,
-                       "custom_color": custom_colors, "config_name": config_name, "headers": headers}
+                       "custom_color": custom_colors, "config_name": config_name, "headers": headers,
+                       "backend": backend, "file_format": file_format, "output_dir": output_dir,
+                       "group_by": group_by, "max_workers": max_workers}
         dict_inputs = AAlogoMaker._check_function_inputs(dict_input=dict_inputs)
 
 
-        if dict_inputs["config_name"] is not None:
-            config_set = True
-        else:
-            config_set = False
-
-        # get AA order / theme for AAlogo
-        # ______________________________________________________________________________________________________________
-        sep = StandardConfig.find_folderpath()[1]
-        path_file = os.path.abspath(os.path.dirname(__file__))
-        data_hydrophobicity_scales = pd.read_excel(f"{path_file.split("aalogo")[0]}grad_scales{sep}"
-                                                   f"scales_hydrophobicity.xlsx")
-        if theme not in data_hydrophobicity_scales.columns.tolist():
-            theme = "Kyte-Doolittle"
-        theme_df = (data_hydrophobicity_scales[["aa_code", theme]].sort_values(by=theme, ascending=False)
-                    .reset_index().drop("index", axis=1))
-
-        order_aa_grad = theme_df["aa_code"]
-        color_advance = theme_df[theme]
-        # config is always dominant if name is given!
-        set_legend = False
-        # config is always dominant if name is given!
-        if config_set:
-            order_aa_grad, color_advance = None, None
-            set_legend = True
+        config_set, order_aa_grad, color_advance, set_legend, available_themes = \
+            AAlogoMaker._style_options(dict_inputs["config_name"], theme)
         # have an attribute with all sorting options
-        # ______________________________________________________________________________________________________________
-        AAlogoMaker.single_mode.available_themes = [item for item in
-                                                    data_hydrophobicity_scales.columns.tolist()[2:]]
-
-        for arg_pos in self.args_position:
-            init_aalogo = _AALogoGenerator(set_legend=set_legend, list_columns=[self.column_seq, arg_pos],
-                                           start_pos=start_pos)
+        AAlogoMaker.single_mode.available_themes = available_themes
 
-            # Plot generation command
-            # make_logo(df, name, length_tmd, length_jmd, aa_config_section_name, font_type="classic_AA_fonts")
-            init_aalogo._make_logo(df=self.df, name=str(self.name), length_right=dict_inputs["aa_right"],
-                                   length_left=dict_inputs["aa_left"], font_type=dict_inputs["font_type"],
-                                   config_set=config_set, aa_config_section_name=dict_inputs["config_name"],
-                                   order_aa_grad=order_aa_grad, color_advance=color_advance,
-                                   list_title_sides=dict_inputs["headers"], color_grad=custom_colors)
+        # all anchor columns counted in one pass, drawn with one glyph set
+        list_anchors = [(arg_pos, start_pos, dict_inputs["aa_right"], dict_inputs["aa_left"], dict_inputs["headers"])
+                        for arg_pos in self.args_position]
+        return self._anchor_logos(list_anchors, dict_inputs, config_set, order_aa_grad, color_advance, set_legend,
+                                  custom_colors, theme)
 
     @timingmethod
     def tmd_mode(self, start_pos: bool = True, aa_jmd: int = 5, aa_tmd: int = 5, font_type: str = "bold_AA_fonts",
                  theme: str = "Kyte-Doolittle", custom_colors: list = None, config_name: str = None,
-                 headers: list = None):
+                 headers: list = None, backend: str = "artist", file_format: str = "png",
+                 output_dir: str = None, group_by: str = None, max_workers: int = 1):
         # check inputs
         # ______________________________________________________________________________________________________________
         AAlogoMaker._check_self(self)
         dict_inputs = {"start_pos": start_pos, "aa_right": aa_tmd, "aa_left": aa_jmd, "font_type": font_type,
-                       "custom_color": custom_colors, "config_name": config_name, "headers": headers}
+                       "custom_color": custom_colors, "config_name": config_name, "headers": headers,
+                       "backend": backend, "file_format": file_format, "output_dir": output_dir,
+                       "group_by": group_by, "max_workers": max_workers}
         dict_inputs = AAlogoMaker._check_function_inputs(dict_input=dict_inputs)
 
-        if dict_inputs["config_name"] is not None:
-            config_set = True
-        else:
-            config_set = False
-
-        # get AA order / theme for AAlogo
-        # ______________________________________________________________________________________________________________
-        sep = StandardConfig.find_folderpath()[1]
-        path_file = os.path.abspath(os.path.dirname(__file__))
-        data_hydrophobicity_scales = pd.read_excel(f"{path_file.split("aalogo")[0]}grad_scales{sep}"
-                                                   f"scales_hydrophobicity.xlsx")
-        if theme not in data_hydrophobicity_scales.columns.tolist():
-            theme = "Kyte-Doolittle"
-        theme_df = (data_hydrophobicity_scales[["aa_code", theme]].sort_values(by=theme, ascending=False)
-                    .reset_index().drop("index", axis=1))
-
-        order_aa_grad = theme_df["aa_code"]
-        color_advance = theme_df[theme]
-        set_legend = False
-        # config is always dominant if name is given!
-        if config_set:
-            order_aa_grad, color_advance = None, None
-            set_legend = True
+        config_set, order_aa_grad, color_advance, set_legend, available_themes = \
+            AAlogoMaker._style_options(dict_inputs["config_name"], theme)
         # have an attribute with all sorting options
-        # ______________________________________________________________________________________________________________
-        AAlogoMaker.tmd_mode.available_themes = [item for item in
-                                                 data_hydrophobicity_scales.columns.tolist()[2:]]
+        AAlogoMaker.tmd_mode.available_themes = available_themes
 
         # algorithm with TMD mode, check only two *args allowed for start and stop position
         # ______________________________________________________________________________________________________________
@@ -524,18 +773,80 @@ class AAlogoMaker:
         elif len(self.args_position) < 2:
             raise Warning("Only 1 position given, TMD has a start and a stop position!")
 
-        for arg_pos in self.args_position:
-            init_aalogo = _AALogoGenerator(set_legend=set_legend, list_columns=[self.column_seq, arg_pos],
-                                           start_pos=start_pos)
-
-            # Plot generation command
-            # make_logo(df, name, length_tmd, length_jmd, aa_config_section_name, font_type="classic_AA_fonts")
-            init_aalogo._make_logo(df=self.df, name=str(self.name), length_right=dict_inputs["aa_right"],
-                                   length_left=dict_inputs["aa_left"], font_type=dict_inputs["font_type"],
-                                   config_set=config_set, aa_config_section_name=dict_inputs["config_name"],
-                                   order_aa_grad=order_aa_grad, color_advance=color_advance,
-                                   list_title_sides=dict_inputs["headers"], color_grad=custom_colors)
-            start_pos = False  # change orientation for stop position
-            if dict_inputs["headers"] is not None:
-                dict_inputs["headers"].reverse()
-            dict_inputs["aa_right"], dict_inputs["aa_left"] = dict_inputs["aa_left"], dict_inputs["aa_right"]
+        # start position (JMD | TMD) and stop position (TMD | JMD, headers swapped) counted in one pass
+        headers = dict_inputs["headers"]
+        list_anchors = [(self.args_position[0], start_pos, dict_inputs["aa_right"], dict_inputs["aa_left"], headers),
+                        (self.args_position[1], False, dict_inputs["aa_left"], dict_inputs["aa_right"],
+                         None if headers is None else headers[::-1])]
+        return self._anchor_logos(list_anchors, dict_inputs, config_set, order_aa_grad, color_advance, set_legend,
+                                  custom_colors, theme)
+
+    @staticmethod
+    @timingmethod
+    def count_mode(counts, name: str, start_pos: bool = True, aa_right: int = 5, aa_left: int = 5,
+                   font_type: str = "bold_AA_fonts", theme: str = "Kyte-Doolittle", custom_colors: list = None,
+                   config_name: str = None, headers: list = None, backend: str = "artist", file_format: str = "png",
+                   output_dir: str = None):
+        """
+        Logo of a precomputed count matrix (e.g. SeqStream.fasta_counts), no pd.DataFrame needed,
+        counts must have aa_left + aa_right positions
+
+        Returns
+        _______
+        path_logo : path of the saved logo
+        """
+        dict_inputs = {"start_pos": start_pos, "aa_right": aa_right, "aa_left": aa_left, "font_type": font_type,
+                       "custom_color": custom_colors, "config_name": config_name, "headers": headers,
+                       "backend": backend, "file_format": file_format, "output_dir": output_dir}
+        dict_inputs = AAlogoMaker._check_function_inputs(dict_input=dict_inputs)
+
+        config_set, order_aa_grad, color_advance, set_legend, available_themes = \
+            AAlogoMaker._style_options(dict_inputs["config_name"], theme)
+
+        init_aalogo = _AALogoGenerator(set_legend=set_legend, list_columns=[], start_pos=dict_inputs["start_pos"])
+        return init_aalogo._make_logo(df=None, name=str(name), length_right=dict_inputs["aa_right"],
+                                      length_left=dict_inputs["aa_left"], font_type=dict_inputs["font_type"],
+                                      config_set=config_set, aa_config_section_name=dict_inputs["config_name"],
+                                      order_aa_grad=order_aa_grad, color_advance=color_advance,
+                                      list_title_sides=dict_inputs["headers"], color_grad=custom_colors,
+                                      backend=dict_inputs["backend"], file_format=dict_inputs["file_format"],
+                                      output_dir=dict_inputs["output_dir"], counts=counts)
+
+
+# parallel drawing of the logos of one AAlogoMaker call (e.g. group_by)
+# ______________________________________________________________________________________________________________________
+def _draw_logo(dict_logo: dict):
+    """
+    Draws one logo of AAlogoMaker._anchor_logos, dict_logo = _AALogoGenerator and _make_logo arguments
+    (module level --> callable in worker processes)
+    """
+    dict_logo = dict(dict_logo)
+    init_aalogo = _AALogoGenerator(set_legend=dict_logo.pop("set_legend"), list_columns=dict_logo.pop("list_columns"),
+                                   start_pos=dict_logo.pop("start_pos"))
+    return init_aalogo._make_logo(df=None, **dict_logo)
+
+
+def _draw_logos_parallel(list_logos: list, max_workers: int, glyph_keys: list):
+    """
+    Draws the logos across a ProcessPoolExecutor (matplotlib drawing holds the GIL, threads do not scale),
+    the glyphs are recolored once here and shared with the workers in shared memory (GlyphAtlas)
+
+    Returns
+    _______
+    list_paths : paths of the saved logos (order of list_logos)
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from aalogo import GlyphAtlas
+    from aalogo import LogoBatch
+
+    try:
+        atlas = GlyphAtlas.GlyphAtlas.publish(glyph_keys)
+    except OSError:                             # no shared memory --> every worker loads the glyphs itself
+        atlas = None
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=LogoBatch.warm_worker,
+                                 initargs=(glyph_keys, None if atlas is None else atlas.descriptor)) as executor:
+            return list(executor.map(_draw_logo, list_logos))
+    finally:
+        if atlas is not None:
+            atlas.close()
@@ -0,0 +1,200 @@
+# standard libs
+import os
+import ast
+import threading
+from configparser import ConfigParser
+from typing import NamedTuple
+
+
+# typed LogoStyle.ini entries
+# ______________________________________________________________________________________________________________________
+class AACategory(NamedTuple):
+    name: str                   # category name (lower case, ConfigParser option name), shown in the legend
+    residues: tuple             # amino acid letters of the category
+    rgb: tuple                  # (R, G, B), clipped to 0 to 255
+
+
+class AAConfig(NamedTuple):
+    name: str                   # section name, config_name of the modes
+    categories: tuple           # AACategory entries in file order
+
+
+class BackgroundStyle(NamedTuple):
+    tmd: tuple = None           # (R, G, B) of the tmd side, None --> default color
+    jmd: tuple = None           # (R, G, B) of the jmd side, None --> default color
+    gradient: tuple = None      # (R, G, B) of the gradient image
+
+
+BG_SECTION = "bg_style"
+
+
+def ini_path():
+    """
+    Returns
+    _______
+    path of the packaged LogoStyle.ini
+    """
+    return os.path.join(os.path.abspath(os.path.dirname(__file__)), "LogoStyle.ini")
+
+
+# parsing and validation
+# ______________________________________________________________________________________________________________________
+def _rgb(value, where: str):
+    try:
+        r, g, b = value
+        return tuple(min(max(channel, 0), 255) for channel in (r, g, b))
+    except (TypeError, ValueError):
+        raise ValueError(f"{where}: {value!r} is not an RGB color [R, G, B]") from None
+
+
+def make_config(name: str, dict_categories: dict):
+    """
+    Validates one amino acid color configuration
+
+    Parameters
+    __________
+    name : config name
+    dict_categories : {category: [residues ("F,Y,W" or list of letters), [R, G, B]]}
+
+    Returns
+    _______
+    config : AAConfig
+    """
+    from aalogo.SeqEngine import AA_ALPHABET
+
+    list_categories = []
+    for category, entry in dict_categories.items():
+        where = f"[{name}] {category}"
+        try:
+            residues, rgb = entry
+        except (TypeError, ValueError):
+            raise ValueError(f"{where}: expected [amino acids, [R, G, B]], got {entry!r}") from None
+        if isinstance(residues, str):
+            residues = residues.split(",")
+        list_residues = []
+        for aa in residues:
+            aa = str(aa).strip()
+            if aa not in AA_ALPHABET or len(aa) != 1:
+                print(f"{aa} is not a valid character for amino acid nomenclature")
+                continue
+            list_residues.append(aa)
+        list_categories.append(AACategory(str(category), tuple(list_residues), _rgb(rgb, where)))
+    return AAConfig(name, tuple(list_categories))
+
+
+def parse_ini(path_ini: str):
+    """
+    Parses a LogoStyle.ini like file once
+
+    Returns
+    _______
+    dict_configs : {section name: AAConfig} of all amino acid sections
+    background : BackgroundStyle of the [bg_style] section, None if missing
+    """
+    config = ConfigParser()
+    if not config.read(path_ini):
+        raise FileNotFoundError(f"{path_ini} can not be read")
+
+    dict_configs, background = {}, None
+    for section in config.sections():
+        try:
+            dict_entries = {key: ast.literal_eval(value) for key, value in config[section].items()}
+        except (ValueError, SyntaxError) as error:
+            raise ValueError(f"[{section}] of {path_ini} is not valid: {error}") from None
+        if section == BG_SECTION:
+            background = BackgroundStyle(*(None if dict_entries.get(key) is None
+                                           else _rgb(dict_entries[key], f"[{section}] {key}")
+                                           for key in BackgroundStyle._fields))
+        else:
+            dict_configs[section] = make_config(section, dict_entries)
+    return dict_configs, background
+
+
+class ConfigRegistry:
+    """
+    All color configurations, the packaged LogoStyle.ini is parsed once and again only if its mtime changes,
+    extra configs (paths or dicts) can be registered on top without touching the packaged file
+    """
+
+    def __init__(self, path_ini: str = None):
+        self.path_ini = path_ini or ini_path()
+        self._files = {}                        # path --> (mtime_ns, dict_configs, background), in register order
+        self._registered = {}                   # configs registered from dicts
+        self._lock = threading.Lock()
+        self._files[self.path_ini] = None
+
+    def _refresh(self):
+        with self._lock:
+            for path_file, parsed in self._files.items():
+                mtime_ns = os.stat(path_file).st_mtime_ns
+                if parsed is None or parsed[0] != mtime_ns:
+                    self._files[path_file] = (mtime_ns, *parse_ini(path_file))
+            dict_configs, background = {}, BackgroundStyle()
+            for mtime_ns, configs_file, background_file in self._files.values():
+                dict_configs.update(configs_file)
+                if background_file is not None:
+                    background = background_file
+            dict_configs.update(self._registered)
+        return dict_configs, background
+
+    def register(self, source, name: str = None):
+        """
+        Adds configs (same name --> replaces the packaged config)
+
+        Parameters
+        __________
+        source : path of a .ini file (all its sections, [bg_style] replaces the background)
+                 or dict {category: [residues, [R, G, B]]} (needs name)
+                 or dict {config name: {category: [residues, [R, G, B]]}}
+
+        Returns
+        _______
+        list_names : names of the registered configs
+        """
+        if isinstance(source, (str, os.PathLike)):
+            path_file = os.fspath(source)
+            parsed = parse_ini(path_file)
+            with self._lock:
+                self._files[path_file] = (os.stat(path_file).st_mtime_ns, *parsed)
+            return list(parsed[0])
+        if not isinstance(source, dict):
+            raise TypeError("config source needs to be a path or a dict")
+        dict_sources = {name: source} if name is not None else source
+        dict_configs = {config_name: make_config(config_name, dict_categories)
+                        for config_name, dict_categories in dict_sources.items()}
+        with self._lock:
+            self._registered.update(dict_configs)
+        return list(dict_configs)
+
+    def config_names(self):
+        return list(self._refresh()[0])
+
+    def get(self, name: str):
+        dict_configs = self._refresh()[0]
+        if name not in dict_configs:
+            raise KeyError(f"{name} is not a color config ({', '.join(dict_configs)})")
+        return dict_configs[name]
+
+    def background(self):
+        return self._refresh()[1]
+
+
+# process-wide instance
+# ______________________________________________________________________________________________________________________
+config_registry = ConfigRegistry()
+
+
+def register_config(source, name=None):
+    return config_registry.register(source, name=name)
+
+
+def config_names():
+    return config_registry.config_names()
+
+
+def get_config(name):
+    return config_registry.get(name)
+
+
+def background_style():
+    return config_registry.background()
@@ -0,0 +1,243 @@
+# standard libs
+import io
+import os
+import sys
+import json
+import glob
+import hashlib
+import argparse
+import threading
+from importlib import resources
+# intern
+from aalogo import StandardConfig
+
+
+# font atlases: all images of a font package packed into one PNG sprite sheet, the index is stored in the PNG itself
+# ______________________________________________________________________________________________________________________
+# index (JSON, PNG text chunk ATLAS_KEY, written before the pixels --> readable without decoding the sheet)
+#   "version" : ATLAS_VERSION, "font_type" : font package name
+#   "glyphs" : {image name: [x, y, width, height]} (RGBA rectangles of the sheet)
+# shipped atlases are package data (aalogo/atlases/<font_type>.png, importlib.resources --> also from zipped or
+# site-packages installs), user atlases are added with register_font() or AALOGO_FONT_ATLASES (os.pathsep separated
+# atlas files, inherited by LogoBatch worker processes), fonts without atlas are read from the fonts/ folders
+# the decoded sheets are kept as uncompressed .npy files in the user cache directory and memory mapped (FontAtlas.sheet)
+# after editing a font folder, repack it: python -m aalogo.FontAtlas fonts/bold_AA_fonts --output-dir aalogo/atlases
+ATLAS_VERSION = 1
+ATLAS_KEY = "aalogo-atlas"
+ATLAS_DIR = "atlases"
+ATLAS_WIDTH = 4096                              # sheet width of pack_font, wider glyphs get a row of their own
+_atlases = {}
+_lock = threading.Lock()
+
+
+class FontAtlas:
+    """
+    Sprite sheet of one font package, the pixels are decoded on first use (index and digest need no decoding)
+    """
+
+    def __init__(self, font_type: str, data: bytes, dict_glyphs: dict):
+        self.font_type = font_type
+        self.data = data
+        self.glyphs = dict_glyphs
+        self.digest = hashlib.sha256(data).hexdigest()
+        self._sheet = None
+        self._lock = threading.Lock()
+
+    def __contains__(self, image_name):
+        return image_name in self.glyphs
+
+    @property
+    def sheet(self):
+        if self._sheet is None:
+            with self._lock:
+                if self._sheet is None:
+                    self._sheet = self._load_sheet()
+        return self._sheet
+
+    def _load_sheet(self):
+        # PNG decoded once into an uncompressed .npy of the user cache directory (key = atlas digest), later
+        # processes memory map it --> no decoding, the pages are shared by all processes (LogoBatch workers)
+        import numpy as np
+        from PIL import Image
+
+        try:
+            path_npy = os.path.join(StandardConfig.cache_directory("atlases"),
+                                    f"{self.font_type}-{self.digest[:24]}.npy")
+        except OSError:
+            path_npy = None                     # no cache directory --> decoded in every process
+        if path_npy is not None and os.path.exists(path_npy):
+            try:
+                return np.load(path_npy, mmap_mode="r")
+            except (OSError, ValueError):
+                pass                            # damaged file --> decoded and written again
+        with Image.open(io.BytesIO(self.data)) as im:
+            sheet = np.asarray(im.convert("RGBA"))
+        if path_npy is not None:
+            # write + rename, parallel processes never map a half written file
+            path_tmp = f"{path_npy}.{os.getpid()}.tmp.npy"
+            try:
+                np.save(path_tmp, sheet)
+                os.replace(path_tmp, path_npy)
+            except OSError:
+                pass                            # read only cache --> decoded in every process
+        sheet.flags.writeable = False
+        return sheet
+
+    def pixels(self, image_name: str):
+        """
+        Returns
+        _______
+        pixels : uint8 array (height, width, 4), read only view into the sheet
+        """
+        x, y, width, height = self.glyphs[image_name]
+        return self.sheet[y:y + height, x:x + width]
+
+    def image(self, image_name: str, tuple_rgb=None):
+        """
+        Same image as the PNG of the font folder (LogoUtil.convert_image_color for tuple_rgb)
+
+        Returns
+        _______
+        im : PIL image (RGBA), a new image (not a view of the sheet)
+        """
+        import numpy as np
+        from PIL import Image
+        from aalogo import LogoUtil
+
+        color_channels = np.array(self.pixels(image_name))
+        if tuple_rgb is not None:
+            LogoUtil.recolor_pixels(color_channels, tuple_rgb)
+        return Image.fromarray(color_channels)
+
+
+def _read_index(data: bytes):
+    from PIL import Image
+
+    with Image.open(io.BytesIO(data)) as im:
+        index = json.loads(im.info[ATLAS_KEY])
+    if index.get("version") != ATLAS_VERSION:
+        raise ValueError(f"font atlas version {index.get('version')} is not supported (version {ATLAS_VERSION})")
+    return index
+
+
+def register_font(path_atlas: str, font_type: str = None):
+    """
+    Makes a packed font (pack_font) available as font_type of the logos, replaces a shipped atlas of the same name
+
+    Parameters
+    __________
+    path_atlas : atlas file
+    font_type : name of the font, None --> name stored in the atlas
+
+    Returns
+    _______
+    font_type
+    """
+    with open(path_atlas, "rb") as file_atlas:
+        data = file_atlas.read()
+    index = _read_index(data)
+    font_type = font_type or index["font_type"]
+    with _lock:
+        _atlases[font_type] = FontAtlas(font_type, data, index["glyphs"])
+    return font_type
+
+
+def _register_environment():
+    for path_atlas in filter(None, os.environ.get("AALOGO_FONT_ATLASES", "").split(os.pathsep)):
+        try:
+            register_font(path_atlas)
+        except (OSError, KeyError, ValueError):
+            print(f"Font atlas {path_atlas} can not be read, skipped")
+
+
+def load_atlas(font_type: str):
+    """
+    Returns
+    _______
+    atlas : FontAtlas of a registered or shipped font, None --> no atlas (images are read from the font folder)
+    """
+    if font_type in _atlases:
+        return _atlases[font_type]
+    with _lock:
+        if font_type not in _atlases:
+            atlas = None
+            try:
+                data = resources.files("aalogo").joinpath(ATLAS_DIR, f"{font_type}.png").read_bytes()
+                atlas = FontAtlas(font_type, data, _read_index(data)["glyphs"])
+            except (OSError, KeyError, ValueError):
+                pass
+            _atlases[font_type] = atlas
+    return _atlases[font_type]
+
+
+# converter
+# ______________________________________________________________________________________________________________________
+def pack_font(path_folder: str, path_atlas: str = None, font_type: str = None, width_sheet: int = ATLAS_WIDTH):
+    """
+    Packs all .png images of a font folder (e.g. the 20 amino acid letters, white surfaces are recolored by the
+    palettes) into one atlas, rows of glyphs sorted by height (shelf packing)
+
+    Parameters
+    __________
+    path_folder : folder with one <image name>.png per glyph
+    path_atlas : atlas file, None --> <folder name>.png next to the folder
+    font_type : font name stored in the atlas, None --> folder name
+    width_sheet : maximal sheet width in pixels
+
+    Returns
+    _______
+    path_atlas
+    """
+    import numpy as np
+    from PIL import Image, PngImagePlugin
+
+    path_folder = os.path.abspath(path_folder)
+    font_type = font_type or os.path.basename(path_folder)
+    path_atlas = path_atlas or f"{path_folder}.png"
+    dict_pixels = {}
+    for path_png in sorted(glob.glob(os.path.join(path_folder, "*.png"))):
+        with Image.open(path_png) as im:
+            dict_pixels[os.path.splitext(os.path.basename(path_png))[0]] = np.asarray(im.convert("RGBA"))
+    if not dict_pixels:
+        raise ValueError(f"{path_folder} contains no .png images")
+
+    dict_glyphs, x, y, height_row = {}, 0, 0, 0
+    for image_name in sorted(dict_pixels, key=lambda name: (-dict_pixels[name].shape[0], name)):
+        height, width = dict_pixels[image_name].shape[:2]
+        if x and x + width > width_sheet:
+            x, y, height_row = 0, y + height_row, 0
+        dict_glyphs[image_name] = [x, y, width, height]
+        x, height_row = x + width, max(height_row, height)
+
+    width_used = max(rect[0] + rect[2] for rect in dict_glyphs.values())
+    sheet = np.zeros((y + height_row, width_used, 4), dtype=np.uint8)
+    for image_name, (x, y, width, height) in dict_glyphs.items():
+        sheet[y:y + height, x:x + width] = dict_pixels[image_name]
+    info = PngImagePlugin.PngInfo()
+    info.add_text(ATLAS_KEY, json.dumps({"version": ATLAS_VERSION, "font_type": font_type, "glyphs": dict_glyphs}))
+    os.makedirs(os.path.dirname(os.path.abspath(path_atlas)), exist_ok=True)
+    Image.fromarray(sheet).save(path_atlas, pnginfo=info, optimize=True)
+    return path_atlas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m aalogo.FontAtlas",
+                                     description="packs font folders (one .png per glyph) into font atlases")
+    parser.add_argument("folders", nargs="+", help="font folders, e.g. fonts/bold_AA_fonts")
+    parser.add_argument("--output-dir", help="directory of the atlases (<folder name>.png), default: next to the "
+                                             "folders")
+    args = parser.parse_args(argv)
+
+    for path_folder in args.folders:
+        path_atlas = None
+        if args.output_dir:
+            path_atlas = os.path.join(args.output_dir, f"{os.path.basename(os.path.normpath(path_folder))}.png")
+        print(pack_font(path_folder, path_atlas))
+    return 0
+
+
+_register_environment()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
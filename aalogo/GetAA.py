@@ -1,12 +1,6 @@
-# standard libs
-import os
-import ast
-from configparser import ConfigParser
-import numpy as np
-from PIL import Image
 # intern
-from aalogo import LogoUtil
-from aalogo import StandardConfig
+from aalogo import ConfigRegistry
+from aalogo import GlyphCache
 
 
 def color_fader(position_number, c_top, c_bottom, color_advance=None):
@@ -24,6 +18,8 @@ def color_fader(position_number, c_top, c_bottom, color_advance=None):
     _______
     gradient color, needs to be iterated!
     """
+    import numpy as np
+
     # color advance settings
     if color_advance is not None:
         value_color = color_advance[position_number]
@@ -34,35 +30,49 @@ def color_fader(position_number, c_top, c_bottom, color_advance=None):
     return ((1-value_color) * c1 + (value_color * c2)).tolist()
 
 
-def aa_image_colorizer(aa_config_section_name, font_type="bold_AA_fonts", config_set=True, color_grad=None,
-                       order_aa=None, color_advance=None):
+def gradient_colors(n_colors, c_top, c_bottom, color_advance=None):
     """
-    Amino Acid (aa) .png images reorder and recolor for AALogo generation
+    Colors of all gradient positions at once (color_fader of positions 0 to n_colors - 1)
+
+    Returns
+    _______
+    colors : float array (n_colors, 3)
+    """
+    import numpy as np
+
+    if color_advance is not None:
+        value_color = np.asarray(color_advance, dtype=np.float64)[:n_colors]
+    else:
+        value_color = (np.arange(n_colors) + 1) / 20
+    return (1 - value_color)[:, None] * np.array(c_top) + value_color[:, None] * np.array(c_bottom)
+
+
+def normalize_color_advance(color_advance):
+    """
+    Normalizes scale values to the color gradient position (max value --> 0 = top color, min value --> 1)
+    """
+    return [(1-(float(i) - min(color_advance)) / (max(color_advance) - min(color_advance))) for i in color_advance]
+
+
+def aa_color_palette(aa_config_section_name, config_set=True, color_grad=None, order_aa=None, color_advance=None):
+    """
+    Amino Acid (aa) order and colors for AALogo generation (without images, see aa_image_colorizer)
 
     Paramters
     _________
-    aa_config_section_name : LogoStyle.ini entry of listed Amino Acids and their corresponding RGB-color
-    font_type : font-folder package (bold_AA_fonts, classic_AA_fonts, modern_AA_fonts)
+    aa_config_section_name : ConfigRegistry config (LogoStyle.ini section or registered) of listed Amino Acids
+                             and their corresponding RGB-color
 
     Returns
     _______
-    list_recolor_aa : list of [Amino Acid tag, recolored Amino Acid image]
+    list_aa_rgb : list of [Amino Acid tag, (R, G, B)], None --> original (white) glyph colors
     aa_compare : true order of Amino Acids post transformation (will be generated top to bottom)
-    color_check_box_list : based on LogoStyle.ini, color categories of Amino Acids, can be customized freely
+    list_category_rgb : list of [category, (R, G, B)] of the LogoStyle.ini color categories, None for gradients
     """
 
 
-    # get config file
-    sep = StandardConfig.find_folderpath()[1]
-    path_file = os.path.abspath(os.path.dirname(__file__))
-
-    config_file = f"{path_file}{sep}LogoStyle.ini"
-    config = ConfigParser()
-    config.read(config_file)
-    config.sections()
-
     aa_compare = []  # were all AA mentioned?, if not append white AA
-    list_recolor_aa = []
+    list_aa_rgb = []
 
     # colors for gradient
     # all 20 canonical AA in order --> hydrophobicity to hydrophilicity (Kyte and Doolittle, 1982)
@@ -70,53 +80,25 @@ def aa_image_colorizer(aa_config_section_name, font_type="bold_AA_fonts", config
     color_bottom = [51, 154, 205]  # light blue (hydrophobicity)
     aa_matching_list = ["W", "F", "Y", "V", "L", "I", "M", "A", "P", "C",
                         "G", "S", "T", "N", "Q", "D", "E", "R", "K", "H"]
-    color_check_box_list = []
-
-    # folder paths for the asset generation:
-    path_fonts = f"{path_file.split("aalogo")[0]}fonts"
-    aa_font_type_path = f"{path_fonts}{sep}{font_type}"
-    aa_index_box_path = f"{path_fonts}{sep}AA_letters_common"
+    list_category_rgb = []
 
     # if config is set to True
     # __________________________________________________________________________________________________________________
     if config_set:
 
-        # get all Amino Acid (AA) categories (define color categories of the AA-images)
-        aa_category = list(config[aa_config_section_name])
-
-        for category in aa_category:
-            entry_category = ast.literal_eval(config[aa_config_section_name][category])
-            aa_list = entry_category[0].split(",")
-            for items in aa_list:
-                if not (items in aa_matching_list):
-                    print(f"{items} is not a valid character for amino acid nomenclature")
-                    aa_list.remove(items)
-
-            aa_compare.extend(aa_list)
-            r, g, b = entry_category[1]  # assign new RGB values form .ini file entry
-
-            # check rgb values
-            list_rgb = []
-            for value in [r, g, b]:
-                if value < 0:
-                    value = 0
-                elif value > 255:
-                    value = 255
-                list_rgb.append(value)
-
-            for aa in aa_list:
-                im_recolor = LogoUtil.convert_image_color(aa_font_type_path, aa, tuple(list_rgb))
-                list_recolor_aa.append([aa, im_recolor])
+        # Amino Acid (AA) categories (define color categories of the AA-images), parsed once by the ConfigRegistry
+        for category in ConfigRegistry.get_config(aa_config_section_name).categories:
+            aa_compare.extend(category.residues)
+            for aa in category.residues:
+                list_aa_rgb.append([aa, category.rgb])
 
             # color boxes for index_box
-            im_box_recolor = LogoUtil.convert_image_color(aa_index_box_path, "color_box_index", (r, g, b))
-            color_check_box_list.append([category, im_box_recolor])
+            list_category_rgb.append([category.name, category.rgb])
 
         list_non_specified_aa = [AA for AA in aa_matching_list if AA not in aa_compare]
         aa_compare.extend(list_non_specified_aa)
         for aa in list_non_specified_aa:
-            im = Image.open(f"{aa_font_type_path}{sep}{aa}.png")
-            list_recolor_aa.append([aa, im])
+            list_aa_rgb.append([aa, None])
 
     # if config is set to False (gradient mode)
     # __________________________________________________________________________________________________________________
@@ -133,13 +115,40 @@ def aa_image_colorizer(aa_config_section_name, font_type="bold_AA_fonts", config
 
         # normalize color advance
         if color_advance is not None:
-            color_advance = [(1-(float(i) - min(color_advance)) / (max(color_advance) - min(color_advance))) for i in
-                             color_advance]
-        for aa in aa_compare:
-            im_recolor = LogoUtil.convert_image_color(aa_font_type_path, aa, color_fader(aa_compare.index(aa),
-                                                                                         color_top, color_bottom,
-                                                                                         color_advance))
-            list_recolor_aa.append([aa, im_recolor])
-        color_check_box_list = None             # color_check_box set false since it makes no sense as gradient
+            color_advance = normalize_color_advance(color_advance)
+        colors = gradient_colors(len(aa_compare), color_top, color_bottom, color_advance)
+        list_aa_rgb = [[aa, tuple(rgb)] for aa, rgb in zip(aa_compare, colors.tolist())]
+        list_category_rgb = None                # color_check_box set false since it makes no sense as gradient
 
+    return list_aa_rgb, aa_compare, list_category_rgb
+
+
+def aa_image_colorizer(aa_config_section_name, font_type="bold_AA_fonts", config_set=True, color_grad=None,
+                       order_aa=None, color_advance=None):
+    """
+    Amino Acid (aa) .png images reorder and recolor for AALogo generation
+
+    Paramters
+    _________
+    aa_config_section_name : LogoStyle.ini entry of listed Amino Acids and their corresponding RGB-color
+    font_type : font-folder package (bold_AA_fonts, classic_AA_fonts, modern_AA_fonts)
+
+    Returns
+    _______
+    list_recolor_aa : list of [Amino Acid tag, recolored Amino Acid image, (R, G, B) or None]
+                      (shared GlyphCache images, do not modify)
+    aa_compare : true order of Amino Acids post transformation (will be generated top to bottom)
+    color_check_box_list : based on LogoStyle.ini, color categories of Amino Acids, can be customized freely
+    """
+    list_aa_rgb, aa_compare, list_category_rgb = aa_color_palette(aa_config_section_name, config_set, color_grad,
+                                                                  order_aa, color_advance)
+
+    # all letters of the palette recolored together (GlyphCache.get_many, one broadcast over the font tensor)
+    list_images = GlyphCache.glyph_cache.get_many(font_type, list_aa_rgb)
+    list_recolor_aa = [[aa, im, rgb] for (aa, rgb), im in zip(list_aa_rgb, list_images)]
+    if list_category_rgb is None:
+        color_check_box_list = None
+    else:
+        color_check_box_list = [[category, GlyphCache.get_glyph("AA_letters_common", "color_box_index", rgb)]
+                                for category, rgb in list_category_rgb]
     return list_recolor_aa, aa_compare, color_check_box_list
@@ -0,0 +1,125 @@
+# standard libs
+from multiprocessing import shared_memory
+# intern
+from aalogo import GlyphCache
+
+
+# glyph atlas: the recolored glyphs of a batch in one shared memory block, built once by the parent process
+# ______________________________________________________________________________________________________________________
+# descriptor (dict, small and picklable, passed to the workers)
+#   "name" : shared memory block name, "size" : bytes
+#   "entries" : [[font_type, image_name, rgb or None, offset, width, height]] (GlyphCache keys, RGBA pixels)
+# workers attach() to the block and pin zero-copy PIL views into their GlyphCache --> no font file access and no
+# recoloring in the workers, the pinned images are read only (GlyphCache images are never modified in place)
+_attached = {}                                  # shared memory blocks of this process, kept open for the views
+
+
+def style_keys(font_type: str = "bold_AA_fonts", config_name: str = None, theme: str = None,
+               custom_colors: list = None):
+    """
+    GlyphCache keys of all images a logo of this style draws (letters, legend boxes and background gradients)
+
+    Returns
+    _______
+    list_keys : [(font_type, image_name, rgb)]
+    """
+    from aalogo import ConfigRegistry
+    from aalogo import GetAA
+    from aalogo import ScaleRegistry
+    from aalogo.AALogorizer import AAlogoMaker
+
+    if config_name is not None and config_name not in ConfigRegistry.config_names():
+        config_name = None                      # same fallback as AAlogoMaker._check_function_inputs
+    config_set, order_aa_grad, color_advance, set_legend, available_themes = \
+        AAlogoMaker._style_options(config_name, theme or ScaleRegistry.DEFAULT_THEME)
+    list_aa_rgb, aa_compare, list_category_rgb = GetAA.aa_color_palette(config_name, config_set, custom_colors,
+                                                                        order_aa_grad, color_advance)
+    list_keys = [GlyphCache.GlyphCache.make_key(font_type, aa, rgb) for aa, rgb in list_aa_rgb]
+    for category, rgb in list_category_rgb or []:
+        list_keys.append(GlyphCache.GlyphCache.make_key("AA_letters_common", "color_box_index", rgb))
+    for image_name in ["white_r_grad", "white_l_grad"]:
+        list_keys.append(GlyphCache.GlyphCache.make_key("AA_letters_common", image_name))
+    return list_keys
+
+
+class GlyphAtlas:
+    """
+    Owner of the shared memory block (parent process), close() releases it after the workers are done
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, descriptor: dict):
+        self.shm = shm
+        self.descriptor = descriptor
+
+    @classmethod
+    def publish(cls, keys):
+        """
+        Loads / recolors the glyphs once (GlyphCache of this process) and copies them into one shared memory block
+
+        Parameters
+        __________
+        keys : GlyphCache keys (style_keys), duplicates are stored once
+
+        Returns
+        _______
+        atlas : GlyphAtlas, None if there is nothing to share
+        """
+        import numpy as np
+
+        list_keys = list(dict.fromkeys(GlyphCache.GlyphCache.make_key(*key) for key in keys))
+        if not list_keys:
+            return None
+        list_pixels = [np.asarray(GlyphCache.get_glyph(*key).convert("RGBA")) for key in list_keys]
+        size = sum(pixels.nbytes for pixels in list_pixels)
+        shm = shared_memory.SharedMemory(create=True, size=size)
+        entries, offset = [], 0
+        for (font_type, image_name, rgb), pixels in zip(list_keys, list_pixels):
+            height, width = pixels.shape[:2]
+            np.frombuffer(shm.buf, dtype=np.uint8, count=pixels.nbytes, offset=offset)[:] = pixels.ravel()
+            entries.append([font_type, image_name, None if rgb is None else list(rgb), offset, width, height])
+            offset += pixels.nbytes
+        return cls(shm, {"name": shm.name, "size": size, "entries": entries})
+
+    def close(self):
+        self.shm.close()
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _open(name: str):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)     # Python >= 3.13
+    except TypeError:
+        from multiprocessing import resource_tracker
+
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")       # the parent unlinks the block, not the worker
+        return shm
+
+
+def attach(descriptor: dict):
+    """
+    Pins zero-copy views of a published atlas into the GlyphCache of this process (worker side)
+
+    Returns
+    _______
+    n_glyphs : number of pinned glyphs
+    """
+    from PIL import Image
+
+    shm = _attached.get(descriptor["name"])
+    if shm is None:
+        shm = _attached[descriptor["name"]] = _open(descriptor["name"])
+    for font_type, image_name, rgb, offset, width, height in descriptor["entries"]:
+        view = shm.buf[offset:offset + width * height * 4]
+        im = Image.frombuffer("RGBA", (width, height), view, "raw", "RGBA", 0, 1)
+        GlyphCache.glyph_cache.pin((font_type, image_name, None if rgb is None else tuple(rgb)), im)
+    return len(descriptor["entries"])
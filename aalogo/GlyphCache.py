@@ -0,0 +1,326 @@
+# standard libs
+import os
+import threading
+from collections import OrderedDict
+# intern
+from aalogo import FontAtlas
+from aalogo import LogoUtil
+from aalogo import StandardConfig
+
+
+DEFAULT_LADDER_MB = 128                         # one bold glyph at all 555 heights needs ~68 MB (RGBA)
+
+
+def fonts_path():
+    """
+    Returns
+    _______
+    directory of the font packages (bold_AA_fonts, classic_AA_fonts, modern_AA_fonts, AA_letters_common)
+    """
+    path_package = os.path.dirname(os.path.abspath(__file__))
+    return os.path.join(os.path.dirname(path_package), "fonts")
+
+
+class GlyphCache:
+    """
+    Process-wide LRU cache of (recolored) glyph images, key = (font_type, image name, RGB)
+    cached images are shared --> never modify them in place (resize/copy first)
+    pinned images (e.g. GlyphAtlas views in shared memory) are never evicted
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._store = OrderedDict()
+        self._pinned = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(font_type: str, image_name: str, tuple_rgb=None):
+        # numpy truncates float colors when writing them into the uint8 image, key accordingly
+        rgb = None if tuple_rgb is None else tuple(int(value) for value in tuple_rgb)
+        return font_type, image_name, rgb
+
+    @staticmethod
+    def _load(font_type: str, image_name: str, rgb):
+        atlas = FontAtlas.load_atlas(font_type)
+        if atlas is not None and image_name in atlas:
+            return atlas.image(image_name, rgb)
+        sep = StandardConfig.find_folderpath()[1]
+        folder_path = f"{fonts_path()}{sep}{font_type}"
+        if rgb is None:
+            from PIL import Image
+            im = Image.open(f"{folder_path}{sep}{image_name}.png")
+            im.load()                           # read pixels now, closes the file
+            return im
+        return LogoUtil.convert_image_color(folder_path, image_name, rgb)
+
+    def get(self, font_type: str, image_name: str, tuple_rgb=None):
+        """
+        Parameters
+        __________
+        font_type : font-folder package (bold_AA_fonts, classic_AA_fonts, modern_AA_fonts, AA_letters_common)
+        image_name : .png file name without suffix (e.g. amino acid letter)
+        tuple_rgb : recolor white surfaces with (R, G, B), None --> original image
+
+        Returns
+        _______
+        im : cached PIL image
+        """
+        key = self.make_key(font_type, image_name, tuple_rgb)
+        with self._lock:
+            im = self._pinned.get(key)
+            if im is None:
+                im = self._store.get(key)
+            if im is not None:
+                if key in self._store:
+                    self._store.move_to_end(key)
+                self.hits += 1
+                return im
+            self.misses += 1
+
+        im = self._load(*key)
+        with self._lock:
+            self._store[key] = im
+            self._store.move_to_end(key)
+            while len(self._store) > self.maxsize:
+                self._store.popitem(last=False)
+        return im
+
+    def pin(self, key: tuple, im):
+        """
+        Adds an image outside of the LRU order, key = make_key(font_type, image_name, tuple_rgb)
+        """
+        with self._lock:
+            self._pinned[self.make_key(*key)] = im
+
+    def get_many(self, font_type: str, list_name_rgb: list):
+        """
+        Several glyphs of one font at once, missing letters are recolored together from the font tensor
+        (recolor_letters) instead of one image at a time
+
+        Parameters
+        __________
+        font_type : font-folder package
+        list_name_rgb : [(image name, (R, G, B) or None)]
+
+        Returns
+        _______
+        list_images : cached PIL images, same order as list_name_rgb
+        """
+        list_keys = [self.make_key(font_type, image_name, tuple_rgb) for image_name, tuple_rgb in list_name_rgb]
+        dict_images = {}
+        with self._lock:
+            for key in list_keys:
+                im = self._pinned.get(key)
+                if im is None:
+                    im = self._store.get(key)
+                    if im is not None:
+                        self._store.move_to_end(key)
+                if im is not None:
+                    dict_images[key] = im
+            missing = list(dict.fromkeys(key for key in list_keys if key not in dict_images))
+            self.hits += len(list_keys) - len(missing)
+            self.misses += len(missing)
+
+        letters = [key for key in missing if key[1] in TENSOR_LETTERS and font_type != "AA_letters_common"]
+        if letters:
+            images = recolor_letters(font_type, [key[1] for key in letters], [key[2] for key in letters])
+            dict_images.update(zip(letters, images))
+        for key in missing:
+            if key not in dict_images:
+                dict_images[key] = self._load(*key)
+        with self._lock:
+            for key in missing:
+                self._store[key] = dict_images[key]
+                self._store.move_to_end(key)
+            while len(self._store) > self.maxsize:
+                self._store.popitem(last=False)
+        return [dict_images[key] for key in list_keys]
+
+    def cache_info(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._store), "maxsize": self.maxsize,
+                    "pinned": len(self._pinned)}
+
+    def clear(self):
+        with self._lock:
+            self._store.clear()
+            self._pinned.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# font tensors: the 20 letters of a font package stacked once, recolored in one broadcast
+# ______________________________________________________________________________________________________________________
+TENSOR_LETTERS = "ACDEFGHIKLMNPQRSTVWY"         # row order of the font tensors (SeqEngine.AA_ALPHABET)
+_font_tensors = {}
+_font_tensors_lock = threading.Lock()
+
+
+def font_tensor(font_type: str):
+    """
+    Letters of a font package, loaded once per process
+
+    Returns
+    _______
+    pixels : little endian uint32 array (20, height, width), RGBA pixels (R lowest byte), rows in TENSOR_LETTERS
+             order (read only)
+    alpha : pixels with the alpha byte only
+    white : bool array (20, height, width), white surfaces (recolored by palettes)
+    None if the letters differ in size (e.g. a custom atlas of FontAtlas.pack_font), no common tensor
+    """
+    with _font_tensors_lock:
+        if font_type not in _font_tensors:
+            import numpy as np
+            from PIL import Image
+
+            atlas = FontAtlas.load_atlas(font_type)
+            if atlas is not None and all(letter in atlas for letter in TENSOR_LETTERS):
+                list_pixels = [atlas.pixels(letter) for letter in TENSOR_LETTERS]
+            else:
+                sep = StandardConfig.find_folderpath()[1]
+                folder_path = f"{fonts_path()}{sep}{font_type}"
+                list_pixels = []
+                for letter in TENSOR_LETTERS:
+                    with Image.open(f"{folder_path}{sep}{letter}.png") as im:
+                        list_pixels.append(np.asarray(im.convert("RGBA")))
+            if len({pixels.shape for pixels in list_pixels}) > 1:
+                _font_tensors[font_type] = None
+                return None
+            glyphs = np.stack(list_pixels)
+            white = (glyphs[..., :3] == 255).all(axis=-1)
+            pixels = glyphs.view("<u4")[..., 0]
+            alpha = pixels & np.uint32(0xFF000000)
+            for array in [pixels, alpha, white]:
+                array.flags.writeable = False
+            _font_tensors[font_type] = pixels, alpha, white
+        return _font_tensors[font_type]
+
+
+def recolor_letters(font_type: str, letters: list, list_rgb: list):
+    """
+    Recolors the white surfaces of several letters in one broadcast (same pixels as LogoUtil.convert_image_color)
+
+    Parameters
+    __________
+    font_type : font-folder package
+    letters : amino acid letters (one letter codes)
+    list_rgb : (R, G, B) per letter, None --> original colors
+
+    Returns
+    _______
+    list_images : PIL images (RGBA) of the letters
+    """
+    import numpy as np
+    from PIL import Image
+
+    if len(set(letters)) < len(letters):        # one letter in several colors --> one broadcast per letter
+        return [recolor_letters(font_type, [letter], [rgb])[0] for letter, rgb in zip(letters, list_rgb)]
+    tensor = font_tensor(font_type)
+    if tensor is None:                          # letters of different sizes --> recolored one by one
+        return [GlyphCache._load(font_type, letter, rgb) for letter, rgb in zip(letters, list_rgb)]
+    pixels, alpha, white = tensor
+    rows = [TENSOR_LETTERS.index(letter) for letter in letters]
+    # palette over all 20 rows (tensor order), colors are truncated to integers as numpy does while writing them into
+    # the uint8 image, pixels are little endian uint32 (R lowest byte) --> one contiguous select, alpha is kept
+    colors = np.zeros(len(TENSOR_LETTERS), dtype="<u4")
+    recolor = np.zeros(len(TENSOR_LETTERS), dtype=bool)
+    for row, rgb in zip(rows, list_rgb):
+        if rgb is not None:
+            colors[row] = int(rgb[0]) | int(rgb[1]) << 8 | int(rgb[2]) << 16
+            recolor[row] = True
+    stack = np.where(white & recolor[:, None, None], alpha | colors[:, None, None], pixels)
+    return [Image.fromarray(stack[row][..., None].view(np.uint8)) for row in rows]
+
+
+class GlyphLadder:
+    """
+    Memoized resized glyphs (height ladder of the letter stacks), key = (font_type, image name, RGB, width, height)
+    letter heights are quantized to int(554 * propensity) + 1 --> repeated heights across positions and logos
+    cost a lookup instead of a resample, least recently used sizes are evicted above max_bytes (0 --> no memo)
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_LADDER_MB << 20):
+        self.max_bytes = int(max_bytes)
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._store = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, font_type: str, image_name: str, tuple_rgb, size: tuple, im):
+        """
+        Parameters
+        __________
+        font_type, image_name, tuple_rgb : GlyphCache key of im
+        size : (width, height) of the scaled glyph
+        im : full resolution glyph (GlyphCache image)
+
+        Returns
+        _______
+        im_scaled : im.resize(size), shared --> never modify in place
+        """
+        key = GlyphCache.make_key(font_type, image_name, tuple_rgb) + (int(size[0]), int(size[1]))
+        with self._lock:
+            im_scaled = self._store.get(key)
+            if im_scaled is not None:
+                self._store.move_to_end(key)
+                self.hits += 1
+                return im_scaled
+            self.misses += 1
+
+        im_scaled = im.resize(key[3:])
+        nbytes = key[3] * key[4] * len(im_scaled.getbands())
+        if nbytes > self.max_bytes:
+            return im_scaled
+        with self._lock:
+            if key not in self._store:
+                self._store[key] = im_scaled
+                self.nbytes += nbytes
+            self._evict()
+        return im_scaled
+
+    def _evict(self):
+        while self.nbytes > self.max_bytes:
+            key, im_old = self._store.popitem(last=False)
+            self.nbytes -= key[3] * key[4] * len(im_old.getbands())
+
+    def set_max_bytes(self, max_bytes: int):
+        with self._lock:
+            self.max_bytes = int(max_bytes)
+            self._evict()
+
+    def cache_info(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._store), "nbytes": self.nbytes,
+                    "max_bytes": self.max_bytes}
+
+    def clear(self):
+        with self._lock:
+            self._store.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+# process-wide instances
+# ______________________________________________________________________________________________________________________
+glyph_cache = GlyphCache()
+glyph_ladder = GlyphLadder(float(os.environ.get("AALOGO_GLYPH_LADDER_MB", DEFAULT_LADDER_MB)) * (1 << 20))
+
+
+def get_glyph(font_type, image_name, tuple_rgb=None):
+    return glyph_cache.get(font_type, image_name, tuple_rgb)
+
+
+def get_scaled(font_type, image_name, tuple_rgb, size, im):
+    return glyph_ladder.get(font_type, image_name, tuple_rgb, size, im)
+
+
+def configure_ladder(max_mb: float = DEFAULT_LADDER_MB):
+    """
+    Memory cap of the glyph height ladder in MB (0 --> every letter is resampled), also AALOGO_GLYPH_LADDER_MB
+    """
+    glyph_ladder.set_max_bytes(max_mb * (1 << 20))
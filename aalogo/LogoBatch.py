@@ -0,0 +1,310 @@
+# standard libs
+import io
+import os
+import sys
+import json
+import time
+import hashlib
+import traceback
+import functools
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+# intern
+from aalogo import AALogorizer
+from aalogo import GlyphAtlas
+from aalogo import GlyphCache
+from aalogo import RenderCache
+
+
+# batch rendering of many logos across a process pool
+# ______________________________________________________________________________________________________________________
+# job (dict)
+#   "df" or "path" : pd.DataFrame or table file (.xlsx, .xls, .csv, .tsv, .pkl, .parquet), files are read and
+#                    encoded once per process (shared_input), "path" can also be a memory mapped corpus directory
+#                    (SeqCorpus.SequenceCorpus.save_mmap, see map_inputs), mapped once and shared by all processes
+#   "corpus" : SeqCorpus.SequenceCorpus with the anchor columns instead of "df" / "path" (mapped corpora are sent
+#              to the workers as path)
+#   "name" : logo name
+#   "column_seq" : column with the amino acid sequences
+#   "positions" : list of columns with the alignment positions (*args_position of AAlogoMaker)
+#   "mode" : "single" (default) or "tmd"
+#   "policy" : residues that are no amino acids, "mask" (default), "drop" or "raise" (policy of AAlogoMaker)
+#   "options" : keyword arguments of AAlogoMaker.single_mode / tmd_mode (aa_right, theme, config_name, output_dir, ...)
+# record (dict)
+#   "index", "name", "mode", "status" ("ok" / "failed"), "paths", "seconds", "error", "traceback", "log",
+#   "cache_hits", "cache_misses" (RenderCache lookups of the job, 0 if the cache is off)
+
+
+def load_table(path_table: str):
+    """
+    Reads a sequence table into a pd.DataFrame based on its file suffix (csv if unknown)
+    """
+    import pandas as pd
+
+    suffix = os.path.splitext(path_table)[1].lower()
+    if suffix in [".xlsx", ".xls"]:
+        return pd.read_excel(path_table)
+    if suffix == ".tsv":
+        return pd.read_csv(path_table, sep="\t")
+    if suffix in [".pkl", ".pickle"]:
+        return pd.read_pickle(path_table)
+    if suffix == ".parquet":
+        return pd.read_parquet(path_table)
+    return pd.read_csv(path_table)
+
+
+@functools.lru_cache(maxsize=8)
+def _shared_input(path_table: str, mtime_ns: int, column_seq: str, policy: str):
+    """
+    Table and encoded sequences of an input file, shared by all jobs of a process on the same file (read only)
+    """
+    from aalogo.SeqCorpus import SequenceCorpus
+
+    if SequenceCorpus.is_mmap(path_table):
+        return None, SequenceCorpus.open_mmap(path_table)
+    df = load_table(path_table)
+    corpus = SequenceCorpus.from_dataframe(df, column_seq, policy=policy) if column_seq in df.columns else None
+    return df, corpus
+
+
+def shared_input(path_table: str, column_seq: str, policy: str = "mask"):
+    """
+    Returns
+    _______
+    df, corpus : cached pd.DataFrame and SeqCorpus.SequenceCorpus of the table (reloaded if the file changed),
+                 df is None for a memory mapped corpus directory
+    """
+    from aalogo.SeqCorpus import MMAP_MANIFEST
+
+    path_table = os.path.abspath(path_table)
+    path_stat = os.path.join(path_table, MMAP_MANIFEST) if os.path.isdir(path_table) else path_table
+    return _shared_input(path_table, os.stat(path_stat).st_mtime_ns, column_seq, policy)
+
+
+def map_inputs(jobs: list, path_dir: str = None):
+    """
+    Converts the table inputs of the jobs once into memory mapped corpora (sequences, all anchor columns and
+    group_by columns used by the jobs), the jobs are pointed to the corpus directories --> all worker processes
+    share one physical copy of the sequences instead of reading and encoding the table each, jobs with columns
+    missing in the table keep reading the table (notes on stderr)
+
+    Parameters
+    __________
+    jobs : job dicts, changed in place
+    path_dir : parent directory of the corpora, None --> user cache directory (StandardConfig.cache_directory)
+
+    Returns
+    _______
+    jobs : the same job dicts
+    """
+    from aalogo import StandardConfig
+    from aalogo.SeqCorpus import MMAP_MANIFEST, SequenceCorpus
+
+    path_dir = path_dir or StandardConfig.cache_directory("corpora")
+    dict_columns, dict_groups = {}, {}
+    for job in jobs:
+        if "path" in job and not os.path.isdir(job["path"]):
+            key = (os.path.abspath(job["path"]), job["column_seq"], job.get("policy", "mask"))
+            dict_columns.setdefault(key, set()).update(job["positions"])
+            group_by = job.get("options", {}).get("group_by")
+            dict_groups.setdefault(key, set()).update([group_by] if isinstance(group_by, str) else [])
+
+    dict_mapped = {}
+    for (path_table, column_seq, policy), columns_anchor in dict_columns.items():
+        columns_anchor = sorted(columns_anchor)
+        columns_group = sorted(dict_groups[(path_table, column_seq, policy)])
+        # same table version, sequence column, policy, anchor and group columns --> same corpus directory (reused)
+        try:
+            key = repr([path_table, os.stat(path_table).st_mtime_ns, column_seq, policy, columns_anchor,
+                        columns_group])
+            path_corpus = os.path.join(path_dir, hashlib.sha256(key.encode()).hexdigest()[:24])
+            if not SequenceCorpus.is_mmap(path_corpus):
+                df = load_table(path_table)
+                # columns missing in the table (e.g. a mistyped job) are left out, the other jobs are still mapped
+                missing = [column for column in [column_seq] + columns_anchor + columns_group
+                           if column not in df.columns]
+                if column_seq in missing:
+                    raise ValueError(f"{column_seq} not in the table")
+                columns_anchor = [column for column in columns_anchor if column not in missing]
+                columns_group = [column for column in columns_group if column not in missing]
+                corpus = SequenceCorpus.from_dataframe(df, column_seq, columns_anchor=columns_anchor,
+                                                       policy=policy, columns_group=columns_group)
+                corpus.save_mmap(path_corpus)
+            with open(os.path.join(path_corpus, MMAP_MANIFEST), "r") as file_json:
+                dict_manifest = json.load(file_json)
+        except Exception as error:              # its jobs read the table and fail with the error of run_job
+            print(f"{path_table} is not memory mapped ({type(error).__name__}: {error})", file=sys.stderr)
+            continue
+        columns_mapped = set(dict_manifest["anchors"]) | set(dict_manifest.get("groups", {}))
+        dict_mapped[(path_table, column_seq, policy)] = path_corpus, columns_mapped
+
+    for job in jobs:
+        if "path" in job and not os.path.isdir(job["path"]):
+            key = (os.path.abspath(job["path"]), job["column_seq"], job.get("policy", "mask"))
+            path_corpus, columns = dict_mapped.get(key, (None, set()))
+            if path_corpus is None:
+                continue
+            group_by = job.get("options", {}).get("group_by")
+            missing = [column for column in list(job["positions"]) + ([group_by] if isinstance(group_by, str) else [])
+                       if column not in columns]
+            if missing:                         # job reads the table, its error names the missing columns
+                print(f"job {job.get('name')} is not memory mapped, {missing} not in {job['path']}", file=sys.stderr)
+                continue
+            job["path"] = path_corpus
+    return jobs
+
+
+def _new_record(index: int, job: dict):
+    return {"index": index, "name": job.get("name"), "mode": job.get("mode", "single"), "status": "ok",
+            "paths": [], "seconds": 0.0, "error": None, "traceback": None, "log": "", "cache_hits": 0,
+            "cache_misses": 0}
+
+
+def _failed(record: dict, error: BaseException, trace: str = None):
+    record["status"] = "failed"
+    record["error"] = f"{type(error).__name__}: {error}"
+    record["traceback"] = trace
+    return record
+
+
+def run_job(job: dict, index: int = 0):
+    """
+    Renders the logos of one job, exceptions are caught and returned in the record
+
+    Returns
+    _______
+    record : dict (see job / record description above)
+    """
+    record = _new_record(index, job)
+    stats_before = RenderCache.stats()
+    t0 = time.perf_counter()
+    log = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(log):
+            if "df" in job:
+                df, corpus = job["df"], job.get("corpus")
+            elif "corpus" in job:
+                df, corpus = None, job["corpus"]
+            else:
+                df, corpus = shared_input(job["path"], job["column_seq"], job.get("policy", "mask"))
+            maker = AALogorizer.AAlogoMaker(df, job["name"], job["column_seq"], *job["positions"], corpus=corpus,
+                                            policy=job.get("policy", "mask"))
+            mode = job.get("mode", "single")
+            if mode == "single":
+                record["paths"] = maker.single_mode(**job.get("options", {}))
+            elif mode == "tmd":
+                record["paths"] = maker.tmd_mode(**job.get("options", {}))
+            else:
+                raise ValueError(f"{mode} is not a mode (single, tmd)")
+    except Exception as error:
+        _failed(record, error, traceback.format_exc())
+    record["seconds"] = round(time.perf_counter() - t0, 3)
+    record["log"] = log.getvalue()
+    stats_after = RenderCache.stats()
+    if stats_after is not None:
+        record["cache_hits"] = stats_after["hits"] - (stats_before or stats_after)["hits"]
+        record["cache_misses"] = stats_after["misses"] - (stats_before or stats_after)["misses"]
+    return record
+
+
+def _job_glyph_keys(jobs: list):
+    """
+    GlyphCache keys of all glyphs drawn by the jobs (GlyphAtlas.style_keys of every job style)
+    """
+    list_keys = []
+    for job in jobs:
+        options = job.get("options", {})
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                list_keys.extend(GlyphAtlas.style_keys(options.get("font_type", "bold_AA_fonts"),
+                                                       options.get("config_name"), options.get("theme"),
+                                                       options.get("custom_colors")))
+        except Exception:
+            pass                                # an unknown style fails in its own job
+    return list(dict.fromkeys(list_keys))
+
+
+def warm_worker(glyph_keys: list, descriptor: dict = None, pool: bool = True):
+    """
+    Process initializer, attaches to the glyph atlas of the parent (descriptor), else loads / recolors the glyphs
+    once (GlyphCache) before the first job
+
+    Parameters
+    __________
+    glyph_keys : GlyphCache keys of the glyphs (_job_glyph_keys)
+    descriptor : GlyphAtlas.descriptor of the parent, None --> glyphs are loaded from the font files
+    pool : True --> worker process of a pool (Agg backend), False --> the calling process (serial run_batch),
+           its matplotlib backend is left alone
+    """
+    if pool:
+        os.environ.setdefault("MPLBACKEND", "Agg")  # workers never show figures, skip the GUI backend search
+    if descriptor is not None:
+        try:
+            GlyphAtlas.attach(descriptor)
+            return
+        except (OSError, ValueError):
+            pass                                # atlas gone --> load the glyphs from the font files
+    for key in glyph_keys:
+        try:
+            GlyphCache.get_glyph(*key)
+        except Exception:
+            pass                                # a missing glyph fails in its own job, not in the worker
+
+
+def run_batch(jobs, max_workers: int = None, mmap_dir: str = None):
+    """
+    Renders many logo jobs, spread across a ProcessPoolExecutor
+
+    Parameters
+    __________
+    jobs : iterable of job dicts (see job / record description above)
+    max_workers : number of worker processes, None --> os.cpu_count(), 1 --> serial in this process
+    mmap_dir : table inputs are converted into memory mapped corpora in this directory first (map_inputs),
+               "1" --> user cache directory, None --> every process reads the tables itself
+
+    Returns
+    _______
+    list_records : one record per job (same order as jobs), a failing job never aborts the batch
+    """
+    jobs = list(jobs)
+    if mmap_dir is not None:
+        jobs = map_inputs([dict(job) for job in jobs], None if mmap_dir == "1" else mmap_dir)
+    glyph_keys = _job_glyph_keys(jobs)
+
+    if max_workers == 1:
+        warm_worker(glyph_keys, pool=False)
+        return [run_job(job, index) for index, job in enumerate(jobs)]
+
+    # glyphs loaded and recolored once here, the workers attach to them in shared memory (GlyphAtlas)
+    try:
+        atlas = GlyphAtlas.GlyphAtlas.publish(glyph_keys)
+    except OSError:                             # no shared memory --> every worker loads the glyphs itself
+        atlas = None
+    list_records = [None] * len(jobs)
+    try:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=warm_worker,
+                                 initargs=(glyph_keys, None if atlas is None else atlas.descriptor)) as executor:
+            futures = {executor.submit(run_job, job, index): index for index, job in enumerate(jobs)}
+            for future in as_completed(futures):
+                index = futures[future]
+                try:
+                    list_records[index] = future.result()
+                except Exception as error:      # worker died or job could not be pickled
+                    list_records[index] = _failed(_new_record(index, jobs[index]), error)
+    finally:
+        if atlas is not None:
+            atlas.close()
+    return list_records
+
+
+def summarize(list_records: list):
+    """
+    Returns
+    _______
+    dict_summary : number of jobs / failed jobs, seconds and render cache hit rate of a batch
+    """
+    hits = sum(record["cache_hits"] for record in list_records)
+    misses = sum(record["cache_misses"] for record in list_records)
+    return {"jobs": len(list_records), "failed": sum(record["status"] != "ok" for record in list_records),
+            "seconds": round(sum(record["seconds"] for record in list_records), 3), "cache_hits": hits,
+            "cache_misses": misses, "cache_hit_rate": round(hits / (hits + misses), 4) if hits + misses else None}
@@ -0,0 +1,162 @@
+# standard libs
+import os
+import sys
+import csv
+import json
+import argparse
+# intern
+from aalogo import LogoBatch
+
+
+# manifest --> LogoBatch jobs
+# ______________________________________________________________________________________________________________________
+# manifest row (CSV header / TOML [[job]] table / JSON line)
+#   "input" : sequence table (.xlsx, .csv, .tsv, ...), required
+#   "positions" : anchor columns, list or "col_a;col_b", required
+#   "name" : logo name (default: input file name), "column_seq" : sequence column (default: "sequence")
+#   "mode" : "single" (default) or "tmd"
+#   "policy" : residues that are no amino acids, "mask" (default), "drop" or "raise" (AAlogoMaker policy)
+#   every other key is an option of single_mode / tmd_mode, typed by OPTION_TYPES
+#   (aa_right, aa_left, aa_jmd, aa_tmd, font_type, theme, config_name, backend, file_format, output_dir, group_by,
+#   max_workers, ...)
+OPTION_TYPES = {"start_pos": bool, "aa_right": int, "aa_left": int, "aa_jmd": int, "aa_tmd": int, "font_type": str,
+                "theme": str, "config_name": str, "backend": str, "file_format": str, "output_dir": str,
+                "headers": list, "custom_colors": list, "group_by": str, "max_workers": int, "policy": str}
+JOB_KEYS = ["input", "positions", "name", "column_seq", "mode"]
+
+
+def _typed(key: str, value, where: str):
+    """
+    Converts a manifest value (CSV values are text) to the type of the option
+    """
+    value_type = OPTION_TYPES[key]
+    if not isinstance(value, str) or value_type is str:
+        return value
+    text = value.strip()
+    if value_type is bool:
+        if text.lower() not in ["true", "false", "1", "0", "yes", "no"]:
+            raise ValueError(f"{where}: {key} needs to be true or false, got {value!r}")
+        return text.lower() in ["true", "1", "yes"]
+    if value_type is int:
+        try:
+            return int(text)
+        except ValueError:
+            raise ValueError(f"{where}: {key} needs to be an integer, got {value!r}") from None
+    if text.startswith("["):                    # custom_colors = [[r,g,b],[r,g,b]], headers = ["a","b"]
+        return json.loads(text)
+    return text.split(";")
+
+
+def manifest_job(row: dict, where: str):
+    """
+    One manifest row as LogoBatch job
+
+    Returns
+    _______
+    job : dict (see LogoBatch job description)
+    """
+    row = {key: value for key, value in row.items() if value is not None and value != ""}
+    unknown = [key for key in row if key not in JOB_KEYS and key not in OPTION_TYPES]
+    if unknown:
+        raise ValueError(f"{where}: unknown manifest keys {unknown}")
+    for key in ["input", "positions"]:
+        if key not in row:
+            raise ValueError(f"{where}: {key} is missing")
+
+    positions = row["positions"]
+    if isinstance(positions, str):
+        positions = [position.strip() for position in positions.split(";") if position.strip()]
+    options = {key: _typed(key, value, where) for key, value in row.items() if key in OPTION_TYPES}
+    return {"path": row["input"],
+            "name": row.get("name", os.path.splitext(os.path.basename(row["input"]))[0]),
+            "column_seq": row.get("column_seq", "sequence"),
+            "positions": list(positions),
+            "mode": row.get("mode", "single"),
+            "policy": options.pop("policy", "mask"),      # AAlogoMaker argument, no option of the modes
+            "options": options}
+
+
+def read_manifest(path_manifest: str):
+    """
+    Reads a .csv / .tsv, .toml ([[job]] tables) or .jsonl manifest
+
+    Returns
+    _______
+    list_jobs : LogoBatch jobs, relative input / output paths are resolved against the manifest folder
+    """
+    suffix = os.path.splitext(path_manifest)[1].lower()
+    if suffix == ".toml":
+        import tomllib
+        with open(path_manifest, "rb") as file_toml:
+            list_rows = tomllib.load(file_toml).get("job", [])
+    elif suffix in [".jsonl", ".ndjson"]:
+        with open(path_manifest, "r") as file_jsonl:
+            list_rows = [json.loads(line) for line in file_jsonl if line.strip()]
+    else:
+        with open(path_manifest, "r", newline="") as file_csv:
+            list_rows = list(csv.DictReader(file_csv, delimiter="\t" if suffix == ".tsv" else ","))
+
+    path_base = os.path.dirname(os.path.abspath(path_manifest))
+    list_jobs = []
+    for number, row in enumerate(list_rows, start=1):
+        job = manifest_job(row, f"{path_manifest} job {number}")
+        job["path"] = os.path.join(path_base, job["path"])
+        if "output_dir" in job["options"]:
+            job["options"]["output_dir"] = os.path.join(path_base, job["options"]["output_dir"])
+        list_jobs.append(job)
+    return list_jobs
+
+
+# console script "aalogo"
+# ______________________________________________________________________________________________________________________
+def main(argv=None):
+    """
+    aalogo MANIFEST [--workers N] [--output-dir DIR] [--mmap DIR] [--cache DIR] [--cache-mb MB] [--cache-link] [--log]
+    prints one JSON line per job and a summary line,
+    exit code 0 --> all logos rendered, 1 --> a job failed, 2 --> invalid manifest
+    """
+    parser = argparse.ArgumentParser(prog="aalogo", description="renders the amino acid logos of a job manifest")
+    parser.add_argument("manifest", help="jobs as .csv / .tsv, .toml ([[job]] tables) or .jsonl")
+    parser.add_argument("-w", "--workers", type=int, default=1,
+                        help="worker processes (default 1 = this process, 0 = one per CPU)")
+    parser.add_argument("-o", "--output-dir", help="output directory of jobs without output_dir")
+    parser.add_argument("--mmap", nargs="?", const="1",
+                        help="convert the input tables once into memory mapped corpora shared by all workers "
+                             "(without DIR: user cache directory)")
+    parser.add_argument("--cache", nargs="?", const="1",
+                        help="render cache directory, unchanged logos are copied instead of drawn "
+                             "(without DIR: user cache directory)")
+    parser.add_argument("--cache-mb", type=float, help="size limit of the render cache in MB")
+    parser.add_argument("--cache-link", action="store_true", help="hard link cached logos instead of copying")
+    parser.add_argument("--log", action="store_true", help="add the captured log and traceback to the status")
+    args = parser.parse_args(argv)
+
+    try:
+        list_jobs = read_manifest(args.manifest)
+    except (OSError, ValueError) as error:
+        print(json.dumps({"status": "invalid", "manifest": args.manifest, "error": str(error)}))
+        return 2
+    if args.output_dir is not None:
+        for job in list_jobs:
+            job["options"].setdefault("output_dir", os.path.abspath(args.output_dir))
+
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    if args.cache is not None:                  # environment --> also active in the worker processes
+        os.environ["AALOGO_RENDER_CACHE"] = args.cache if args.cache == "1" else os.path.abspath(args.cache)
+        if args.cache_mb is not None:
+            os.environ["AALOGO_RENDER_CACHE_MB"] = str(args.cache_mb)
+        if args.cache_link:
+            os.environ["AALOGO_RENDER_CACHE_LINK"] = "1"
+    list_records = LogoBatch.run_batch(list_jobs, max_workers=args.workers or None,
+                                       mmap_dir=args.mmap if args.mmap in [None, "1"] else os.path.abspath(args.mmap))
+    for record in list_records:
+        if not args.log:
+            record = {key: value for key, value in record.items() if key not in ["log", "traceback"]}
+        print(json.dumps(record))
+    print(json.dumps({"summary": LogoBatch.summarize(list_records)}))
+    sys.stdout.flush()
+    return 0 if all(record["status"] == "ok" for record in list_records) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+# standard libs
+import numpy as np
+# intern
+from aalogo import AALogorizer
+from aalogo import SeqEngine
+from aalogo import SeqStream
+
+
+class PositionCounts:
+    """
+    Persistent, mergeable amino acid counts per window position (rows = SeqEngine codes, gaps last)
+    sequences are counted once when added, a logo is rendered from the counts without recounting
+    """
+
+    def __init__(self, length_right: int, length_left: int, start_pos: bool = True, counts: np.ndarray = None,
+                 n_sequences: int = 0, n_removed: int = 0):
+        """
+        Parameters
+        __________
+        length_right : window size right of the anchor
+        length_left : window size left of the anchor
+        start_pos : see SeqEngine.extract_windows
+        counts : int64 array (SeqEngine.N_CODES, length_left + length_right), None --> empty
+        n_sequences : number of counted windows
+        n_removed : number of sequences removed for missing / invalid anchors
+        """
+        self.length_right = int(length_right)
+        self.length_left = int(length_left)
+        self.start_pos = bool(start_pos)
+        shape = (SeqEngine.N_CODES, self.length_left + self.length_right)
+        if counts is None:
+            counts = np.zeros(shape, dtype=np.int64)
+        elif counts.shape != shape:
+            raise ValueError(f"counts of shape {counts.shape} do not match the window shape {shape}")
+        self.counts = counts.astype(np.int64, copy=True)
+        self.n_sequences = int(n_sequences)
+        self.n_removed = int(n_removed)
+
+    # accumulation
+    # __________________________________________________________________________________________________________________
+    def add(self, sequences, anchors):
+        """
+        Counts the windows of new sequences
+
+        Parameters
+        __________
+        sequences : iterable of amino acid sequences (str) or SeqCorpus.SequenceCorpus
+        anchors : 1-based alignment positions, one per sequence (< 1 or NaN --> removed)
+
+        Returns
+        _______
+        self
+        """
+        anchors = SeqEngine.as_anchors(anchors)
+        if hasattr(sequences, "extract_windows"):
+            windows, kept = sequences.extract_windows(anchors, self.length_right, self.length_left,
+                                                      start_pos=self.start_pos)
+        else:
+            buffer, offsets = SeqEngine.encode_sequences(sequences)
+            if offsets.size - 1 != anchors.size:
+                raise ValueError(f"{anchors.size} anchors given for {offsets.size - 1} sequences")
+            windows, kept = SeqEngine.extract_windows(buffer, offsets, anchors, self.length_right, self.length_left,
+                                                      start_pos=self.start_pos)
+        self.counts += SeqEngine.count_windows(windows)
+        self.n_sequences += windows.shape[0]
+        self.n_removed += int((~kept).sum())
+        return self
+
+    def add_records(self, records, batch_size: int = 4096):
+        """
+        Counts a stream of (sequence, anchor) records, e.g. SeqStream.iter_fasta_anchored()
+
+        Returns
+        _______
+        self
+        """
+        n_records = 0
+
+        def counted():
+            nonlocal n_records
+            for record in records:
+                n_records += 1
+                yield record
+
+        counts, n_removed = SeqStream.count_stream(counted(), self.length_right, self.length_left,
+                                                   start_pos=self.start_pos, batch_size=batch_size)
+        self.counts += counts
+        self.n_sequences += n_records - n_removed
+        self.n_removed += n_removed
+        return self
+
+    def merge(self, other):
+        """
+        Adds the counts of another PositionCounts with the same window (in place)
+
+        Returns
+        _______
+        self
+        """
+        if (other.length_right, other.length_left, other.start_pos) != \
+                (self.length_right, self.length_left, self.start_pos):
+            raise ValueError("only counts of the same window (length_right, length_left, start_pos) can be merged")
+        self.counts += other.counts
+        self.n_sequences += other.n_sequences
+        self.n_removed += other.n_removed
+        return self
+
+    # derived values
+    # __________________________________________________________________________________________________________________
+    @property
+    def totals(self):
+        """
+        Windows per position (amino acids and gaps)
+        """
+        return self.counts.sum(axis=0)
+
+    @property
+    def gaps(self):
+        """
+        Gaps per position
+        """
+        return self.counts[SeqEngine.GAP_CODE]
+
+    def propensities(self):
+        return SeqEngine.propensities(self.counts)
+
+    # persistence
+    # __________________________________________________________________________________________________________________
+    def save(self, path_counts: str):
+        """
+        Saves the counts as .npz (numpy adds the suffix if missing)
+        """
+        np.savez(path_counts, counts=self.counts,
+                 window=np.array([self.length_right, self.length_left, int(self.start_pos)], dtype=np.int64),
+                 stats=np.array([self.n_sequences, self.n_removed], dtype=np.int64))
+
+    @classmethod
+    def load(cls, path_counts: str):
+        with np.load(path_counts) as data:
+            length_right, length_left, start_pos = data["window"].tolist()
+            n_sequences, n_removed = data["stats"].tolist()
+            return cls(length_right, length_left, start_pos=bool(start_pos), counts=data["counts"],
+                       n_sequences=n_sequences, n_removed=n_removed)
+
+    # visualization
+    # __________________________________________________________________________________________________________________
+    def render(self, name: str, **kwargs):
+        """
+        Logo of the current counts (AAlogoMaker.count_mode), only the drawing is done
+
+        Parameters
+        __________
+        name : title of the logo
+        kwargs : styling arguments of AAlogoMaker.count_mode (font_type, theme, config_name, backend, ...)
+
+        Returns
+        _______
+        path_logo : path of the saved logo
+        """
+        return AALogorizer.AAlogoMaker.count_mode(self.counts, name, start_pos=self.start_pos,
+                                                  aa_right=self.length_right, aa_left=self.length_left, **kwargs)
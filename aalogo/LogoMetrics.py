@@ -0,0 +1,175 @@
+# standard libs
+import sys
+import json
+import time
+import logging
+import threading
+import contextlib
+import tracemalloc
+
+
+# pipeline instrumentation: spans, counters and sinks (silent until a sink is added)
+# ______________________________________________________________________________________________________________________
+# span event (dict), passed to every sink when a span ends
+#   "event" : "span", "name" : stage name, "path" : nested span names ("single_mode/_make_logo/save")
+#   "seconds" : wall time, "counters" : {counter: value} of the span and its children, "fields" : span arguments
+#   "thread" : thread name, "peak_bytes" / "peak_rss_mb" : only with configure(memory=True)
+# counters used by the pipeline: "sequences", "windows_dropped", "glyphs", "cache_hits", "cache_misses"
+_sinks = []
+_options = {"memory": False}
+_local = threading.local()
+_lock = threading.Lock()
+
+
+class MemorySink:
+    """
+    Collects the events in a list (e.g. for tests)
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event: dict):
+        self.events.append(event)
+
+    def spans(self, name: str = None):
+        return [event for event in self.events if name is None or event["name"] == name]
+
+
+class JsonLinesSink:
+    """
+    Writes one JSON line per event to a file path (appended) or an open text stream
+    """
+
+    def __init__(self, target=sys.stderr):
+        self.target = target
+        self._lock = threading.Lock()
+
+    def __call__(self, event: dict):
+        line = json.dumps(event, default=str)
+        with self._lock:
+            if isinstance(self.target, str):
+                with open(self.target, "a") as file_jsonl:
+                    file_jsonl.write(line + "\n")
+            else:
+                self.target.write(line + "\n")
+                self.target.flush()
+
+
+class LoggingSink:
+    """
+    Logs every event with the logging module ("aalogo.metrics" logger by default)
+    """
+
+    def __init__(self, logger: str = "aalogo.metrics", level: int = logging.INFO):
+        self.logger = logging.getLogger(logger)
+        self.level = level
+
+    def __call__(self, event: dict):
+        counters = " ".join(f"{key}={value}" for key, value in event["counters"].items())
+        self.logger.log(self.level, "%s %.4f s %s", event["path"], event["seconds"], counters)
+
+
+def add_sink(sink):
+    """
+    Parameters
+    __________
+    sink : callable receiving the event dicts (MemorySink, JsonLinesSink, LoggingSink or own function)
+    """
+    with _lock:
+        _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink):
+    with _lock:
+        if sink in _sinks:
+            _sinks.remove(sink)
+
+
+def clear_sinks():
+    with _lock:
+        _sinks.clear()
+
+
+def configure(memory: bool = False):
+    """
+    Parameters
+    __________
+    memory : True --> peak traced memory (tracemalloc, slows down allocations) and peak RSS per span
+    """
+    _options["memory"] = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def _peak_rss_mb():
+    try:
+        import resource
+    except ImportError:                         # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1 << 20 if sys.platform == "darwin" else 1 << 10), 1)
+
+
+@contextlib.contextmanager
+def span(name: str, **fields):
+    """
+    Times a pipeline stage, nested spans build the event path, does nothing without sinks
+
+    Parameters
+    __________
+    name : stage name
+    fields : extra values of the event (JSON serializable)
+    """
+    if not _sinks:
+        yield
+        return
+
+    stack = _stack()
+    memory = _options["memory"] and tracemalloc.is_tracing()
+    record = {"name": name, "counters": {}, "peak": 0}
+    if memory:
+        if stack:
+            stack[-1]["peak"] = max(stack[-1]["peak"], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+    stack.append(record)
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - t0
+        stack.pop()
+        event = {"event": "span", "name": name, "path": "/".join([entry["name"] for entry in stack] + [name]),
+                 "seconds": round(seconds, 6), "counters": record["counters"], "fields": fields,
+                 "thread": threading.current_thread().name}
+        if memory:
+            event["peak_bytes"] = max(record["peak"], tracemalloc.get_traced_memory()[1])
+            event["peak_rss_mb"] = _peak_rss_mb()
+            tracemalloc.reset_peak()
+        if stack:
+            parent = stack[-1]
+            for key, value in record["counters"].items():
+                parent["counters"][key] = parent["counters"].get(key, 0) + value
+            if memory:
+                parent["peak"] = max(parent["peak"], event["peak_bytes"])
+        for sink in list(_sinks):
+            sink(event)
+
+
+def count(name: str, value: int = 1):
+    """
+    Adds value to a counter of the current span (reported with the span and all its parents)
+    """
+    if not _sinks:
+        return
+    stack = _stack()
+    if stack:
+        counters = stack[-1]["counters"]
+        counters[name] = counters.get(name, 0) + int(value)
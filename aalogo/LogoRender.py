@@ -0,0 +1,204 @@
+# standard libs
+import numpy as np
+from PIL import Image
+from matplotlib.artist import Artist
+from matplotlib.collections import PathCollection
+from matplotlib.font_manager import FontProperties
+from matplotlib.textpath import TextPath
+from matplotlib.transforms import Affine2D
+# intern
+from aalogo import SeqEngine
+
+
+# letter geometry of the AnnotationBbox based logo (_make_logo, backend="artist")
+# ______________________________________________________________________________________________________________________
+GLYPH_WIDTH = 110       # resized letter width in pixels, letters fill one sequence position
+GLYPH_HEIGHT = 554      # letter height in pixels at propensity 1 (full y-axis)
+
+# vector letters: outline font per font package (family, weight), fraction of a position filled by a letter
+VECTOR_FONTS = {"bold_AA_fonts": ("DejaVu Sans", "bold"),
+                "classic_AA_fonts": ("DejaVu Serif", "bold"),
+                "modern_AA_fonts": ("DejaVu Sans Mono", "bold")}
+VECTOR_LETTER_WIDTH = 0.92
+
+
+# raster compositor
+# ______________________________________________________________________________________________________________________
+def glyph_stack(list_images, size: tuple = (GLYPH_WIDTH, GLYPH_HEIGHT)):
+    """
+    Resizes the glyph images once to full letter size and stacks them
+
+    Parameters
+    __________
+    list_images : PIL images of the amino acids (same order as the rows of the propensity matrix)
+    size : (width, height) of one letter at propensity 1 in pixels
+
+    Returns
+    _______
+    glyphs : uint8 array (amino acids, height, width, 4), RGBA
+    """
+    size = (int(size[0]), int(size[1]))
+    return np.stack([np.asarray(im.convert("RGBA").resize(size)) for im in list_images])
+
+
+def composite_letter_stack(matrix, glyphs, bottom_up: bool = False):
+    """
+    Composites all letters of a logo into one RGBA canvas
+
+    Parameters
+    __________
+    matrix : propensity matrix (amino acids, positions), rows ordered from top to bottom of each letter stack
+    glyphs : glyph_stack() of the amino acids, same row order as matrix
+    bottom_up : True --> first canvas row is the bottom of the logo (matplotlib renderer row order)
+
+    Returns
+    _______
+    canvas : uint8 array (glyph height, positions * glyph width, 4), transparent background
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    n_aa, n_pos = matrix.shape
+    full_height, glyph_width = glyphs.shape[1], glyphs.shape[2]
+
+    canvas = np.zeros((full_height, n_pos * glyph_width, 4), dtype=np.uint8)
+    target = canvas[::-1] if bottom_up else canvas
+
+    # letter heights as in the artist backend (int(554*factor)+1), bottom edge at the cumulative propensity
+    heights = (full_height * matrix).astype(np.int64) + 1
+    bottoms = np.rint(full_height * np.cumsum(matrix, axis=0)).astype(np.int64)
+    row_aa, column_pos = np.nonzero(matrix > 0)
+    for aa, pos in zip(row_aa.tolist(), column_pos.tolist()):
+        height = heights[aa, pos]
+        bottom = min(bottoms[aa, pos], full_height)
+        top = max(bottom - height, 0)
+        rows = (np.arange(height - (bottom - top), height) * full_height) // height   # nearest row resampling
+        left = pos * glyph_width
+        # letters only overlap by their +1 pixel row, plain copies are enough
+        target[top:bottom, left:left + glyph_width] = glyphs[aa, rows]
+    return canvas
+
+
+def write_canvas(canvas, path_png: str):
+    """
+    Writes the letter stack canvas directly as .png (no axes, no matplotlib)
+    """
+    Image.fromarray(canvas).save(path_png)
+
+
+class LetterStack(Artist):
+    """
+    All letters of a logo as one matplotlib artist
+
+    At draw time the letters are composited at the output resolution of the axes and blitted as one image,
+    which skips the per-letter AnnotationBbox layout and matplotlib's float image resampling
+    """
+    zorder = 3
+
+    def __init__(self, matrix, list_images, x_start: float):
+        """
+        Parameters
+        __________
+        matrix : propensity matrix (amino acids, positions), rows ordered from top to bottom
+        list_images : PIL images of the amino acids, same order as the rows of matrix
+        x_start : x value of the left edge of the first position (one position = 1 x-unit, y from 0 to 1)
+        """
+        super().__init__()
+        self.matrix = np.asarray(matrix, dtype=np.float64)
+        self.list_images = list_images
+        self.x_start = x_start
+        self._canvas = None                     # (size, canvas) of the last draw, reused for the same size
+
+    def make_canvas(self, width: float, height: float):
+        n_pos = self.matrix.shape[1]
+        size = (max(int(round(width / n_pos)), 1), max(int(round(height)), 1))
+        if self._canvas is None or self._canvas[0] != size:
+            glyphs = glyph_stack(self.list_images, size=size)
+            self._canvas = size, composite_letter_stack(self.matrix, glyphs, bottom_up=True)
+        return self._canvas[1]
+
+    def draw(self, renderer):
+        if not self.get_visible() or self.matrix.shape[1] == 0:
+            return
+        n_pos = self.matrix.shape[1]
+        (x0, y0), (x1, y1) = self.axes.transData.transform([(self.x_start, 0), (self.x_start + n_pos, 1)])
+        # vector renderers (svg, pdf) work in points and place image pixels at image_dpi --> canvas in image
+        # pixels (magnification = image_dpi / 72, 1 for Agg), drawn back at the size of the axes area
+        magnification = renderer.get_image_magnification()
+        canvas = self.make_canvas((x1 - x0) * magnification, (y1 - y0) * magnification)
+        gc = renderer.new_gc()
+        gc.set_clip_rectangle(self.axes.bbox)
+        if magnification == 1:
+            x0, y0 = int(round(x0)), int(round(y0))
+        renderer.draw_image(gc, x0, y0, canvas)
+        gc.restore()
+        self.stale = False
+
+
+# vector letters
+# ______________________________________________________________________________________________________________________
+_letter_paths = {}
+_letter_widths = {}
+
+
+def _raw_letter_path(aa: str, font_type: str):
+    family, weight = VECTOR_FONTS.get(font_type, VECTOR_FONTS["bold_AA_fonts"])
+    return TextPath((0, 0), aa, size=1, prop=FontProperties(family=family, weight=weight))
+
+
+def letter_path(aa: str, font_type: str = "bold_AA_fonts"):
+    """
+    Outline of one amino acid letter, normalized to the unit square (cached per font), the height is stretched to
+    the square, the width keeps the proportions of the font (widest amino acid letter = square width) and the
+    letter is centered --> narrow letters (I, L) stay narrow instead of filling the whole position
+
+    Parameters
+    __________
+    aa : amino acid letter
+    font_type : font package name, mapped to an outline font by VECTOR_FONTS
+
+    Returns
+    _______
+    path : matplotlib.path.Path within (0, 0) to (1, 1), spanning the full height
+    """
+    key = (font_type, aa)
+    if key not in _letter_paths:
+        if font_type not in _letter_widths:
+            _letter_widths[font_type] = max(_raw_letter_path(letter, font_type).get_extents().width
+                                            for letter in SeqEngine.AA_ALPHABET)
+        width_font = _letter_widths[font_type]
+        path = _raw_letter_path(aa, font_type)
+        extents = path.get_extents()
+        width_font = max(width_font, extents.width)         # letters outside of the alphabet
+        unit = (Affine2D().translate(-extents.x0 + (width_font - extents.width) / 2, -extents.y0)
+                .scale(1 / width_font, 1 / extents.height))
+        _letter_paths[key] = unit.transform_path(path)
+    return _letter_paths[key]
+
+
+def vector_letter_stack(matrix, aa_list, list_rgb, x_start: float, font_type: str = "bold_AA_fonts"):
+    """
+    All letters of a logo as one collection of transformed letter outlines (no images, no resampling)
+
+    Parameters
+    __________
+    matrix : propensity matrix (amino acids, positions), rows ordered from top to bottom
+    aa_list : amino acid letters, same order as the rows of matrix
+    list_rgb : (R, G, B) per amino acid (0 to 255), None --> white (original glyph colors)
+    x_start : x value of the left edge of the first position (one position = 1 x-unit, y from 0 to 1)
+    font_type : font package name, mapped to an outline font by VECTOR_FONTS
+
+    Returns
+    _______
+    letters : matplotlib.collections.PathCollection, add with ax.add_collection()
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    tops = 1 - np.cumsum(matrix, axis=0) + matrix          # upper edge of every letter
+    list_paths, list_colors = [], []
+    row_aa, column_pos = np.nonzero(matrix > 0)
+    for aa, pos in zip(row_aa.tolist(), column_pos.tolist()):
+        factor = matrix[aa, pos]
+        transform = (Affine2D().scale(VECTOR_LETTER_WIDTH, factor)
+                     .translate(x_start + pos + (1 - VECTOR_LETTER_WIDTH) / 2, tops[aa, pos] - factor))
+        list_paths.append(transform.transform_path(letter_path(aa_list[aa], font_type)))
+        rgb = (255, 255, 255) if list_rgb[aa] is None else list_rgb[aa]
+        list_colors.append([value / 255 for value in rgb])
+    return PathCollection(list_paths, facecolors=list_colors, edgecolors="black", linewidths=1, zorder=3)
@@ -1,6 +1,4 @@
 # standard libs
-import numpy as np
-from PIL import Image
 # intern
 from aalogo import StandardConfig
 
@@ -22,18 +20,28 @@ def convert_image_color(folder_path, image_name, tuple_rgb):
     _______
     im_recolor : picture with recolored white surfaces
     """
+    import numpy as np
+    from PIL import Image
 
     sep = StandardConfig.find_folderpath()[1]
     im = Image.open(f"{folder_path}{sep}{image_name}.png")
     im_rgba = im.convert("RGBA")
     color_channels = np.array(im_rgba)
+    recolor_pixels(color_channels, tuple_rgb)
+    im_recolor = Image.fromarray(color_channels)
+
+    return im_recolor
+
+
+def recolor_pixels(color_channels, tuple_rgb):
+    """
+    Transforms white pixels of an RGBA array (height, width, 4) into colored pixels in place
+    """
     red, green, blue, alpha = color_channels.T  # alpha is not used
     white_area = (red == 255) & (blue == 255) & (green == 255)
 
     color_channels[..., :-1][white_area.T] = tuple_rgb  # new RGB-values
-    im_recolor = Image.fromarray(color_channels)
-
-    return im_recolor
+    return color_channels
 
 
 # check if contains allowed letters
@@ -49,10 +57,11 @@ def check_input_string(input_str):
     Returns
     _______
     input_str_modify : Amino Acid sequence replaces U with S, all letters upper case
+
+    many sequences at once: SeqEngine.validate_sequences (byte lookup table, report instead of messages)
     """
     if not isinstance(input_str, str):
-        print(f"Input Sequence is not str type")
-        exit()
+        raise TypeError(f"Input Sequence is not str type: {input_str!r}")
 
     input_str_modify = input_str.upper().replace("U", "S")  # replace U (Selenocysteine) with S (Cysteine)
     aa_matching_list = ["-",  # "-" is an empty space --> replaced with None
@@ -0,0 +1,234 @@
+# standard libs
+import os
+import json
+import shutil
+import hashlib
+import threading
+# intern
+from aalogo import FontAtlas
+from aalogo import GlyphCache
+from aalogo import StandardConfig
+
+
+# content addressed cache of rendered logo files
+# ______________________________________________________________________________________________________________________
+# key = sha256 of CACHE_VERSION, count matrix, style (all _make_logo parameters changing the picture, including the
+#       used LogoStyle.ini config and background), glyphs of the font set (atlas or files) and the matplotlib version
+# objects are stored as <cache dir>/<key[:2]>/<key>.<file format>, a hit copies (or hard links) the object
+# activation: configure(), or the environment variables AALOGO_RENDER_CACHE (directory, "1" --> user cache
+#             directory) and AALOGO_RENDER_CACHE_MB (size limit), inherited by LogoBatch worker processes
+CACHE_VERSION = 1
+DEFAULT_MAX_MB = 1024
+EVICT_TO = 0.9                                  # eviction frees down to this fraction of max_bytes
+
+
+def font_digest(font_type: str):
+    """
+    Fingerprint of the glyphs of a font package and the common images, sha256 of the font atlas (FontAtlas) or
+    name, size and mtime of the glyph files of the font folder
+    """
+    sep = StandardConfig.find_folderpath()[1]
+    sha = hashlib.sha256()
+    for folder in [font_type, "AA_letters_common"]:
+        atlas = FontAtlas.load_atlas(folder)
+        if atlas is not None:
+            sha.update(f"{folder}:{atlas.digest};".encode())
+            continue
+        path_folder = f"{GlyphCache.fonts_path()}{sep}{folder}"
+        for entry in sorted(os.scandir(path_folder), key=lambda item: item.name):
+            stat = entry.stat()
+            sha.update(f"{folder}/{entry.name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return sha.hexdigest()
+
+
+class RenderCache:
+    """
+    Size bounded on disk cache of rendered logos, least recently used objects are evicted first
+    """
+
+    def __init__(self, path_dir: str = None, max_bytes: int = DEFAULT_MAX_MB << 20, link: bool = False):
+        """
+        Parameters
+        __________
+        path_dir : cache directory, None --> user cache directory (StandardConfig.cache_directory("renders"))
+        max_bytes : size limit of all cached objects
+        link : True --> hits are hard links to the cached object (no copy, outputs must not be edited in place)
+        """
+        self.path_dir = path_dir or StandardConfig.cache_directory("renders")
+        os.makedirs(self.path_dir, exist_ok=True)
+        self.max_bytes = int(max_bytes)
+        self.link = link
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = None                       # bytes of the cached objects, known after the first evict()
+        self._fonts = {}
+        self._lock = threading.Lock()
+
+    def key(self, counts, dict_style: dict, font_type: str):
+        """
+        Parameters
+        __________
+        counts : count matrix of the logo
+        dict_style : JSON serializable parameters changing the picture
+        font_type : font package name
+
+        Returns
+        _______
+        key : hex digest
+        """
+        import numpy as np
+        import matplotlib
+
+        if font_type not in self._fonts:
+            self._fonts[font_type] = font_digest(font_type)
+        counts = np.ascontiguousarray(counts, dtype=np.int64)
+        sha = hashlib.sha256()
+        sha.update(json.dumps({"version": CACHE_VERSION, "matplotlib": matplotlib.__version__,
+                               "shape": counts.shape, "fonts": self._fonts[font_type], "style": dict_style},
+                              sort_keys=True, default=str).encode())
+        sha.update(counts.tobytes())
+        return sha.hexdigest()
+
+    def _object_path(self, key: str, path_target: str):
+        suffix = os.path.splitext(path_target)[1]
+        return os.path.join(self.path_dir, key[:2], f"{key}{suffix}")
+
+    def fetch(self, key: str, path_target: str):
+        """
+        Puts the cached logo at path_target
+
+        Returns
+        _______
+        hit : True if the logo was cached
+        """
+        path_object = self._object_path(key, path_target)
+        # the old output is removed in any case, a hard linked file must never be overwritten in place
+        if os.path.lexists(path_target):
+            os.remove(path_target)
+        try:
+            if self.link:
+                try:
+                    os.link(path_object, path_target)
+                except OSError:                 # not cached (copy fails too) or cache on another file system
+                    shutil.copyfile(path_object, path_target)
+            else:
+                shutil.copyfile(path_object, path_target)
+            os.utime(path_object)               # recently used
+        except FileNotFoundError:               # not cached (or evicted by another process)
+            with self._lock:
+                self.misses += 1
+            return False
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def store(self, key: str, path_source: str):
+        """
+        Adds a rendered logo, the cache directory is only walked (evict) if the running size total of this
+        process exceeds max_bytes (objects of other processes are counted at the next walk)
+        """
+        path_object = self._object_path(key, path_source)
+        os.makedirs(os.path.dirname(path_object), exist_ok=True)
+        path_tmp = f"{path_object}.{os.getpid()}.{threading.get_ident()}.tmp"
+        shutil.copyfile(path_source, path_tmp)
+        size = os.path.getsize(path_tmp)
+        try:
+            size_replaced = os.path.getsize(path_object)
+        except FileNotFoundError:
+            size_replaced = 0
+        os.replace(path_tmp, path_object)       # parallel workers never see half written objects
+        with self._lock:
+            if self._size is not None:
+                self._size += size - size_replaced
+            walk = self._size is None or self._size > self.max_bytes
+        if walk:
+            self.evict()
+
+    def evict(self):
+        """
+        Sizes all cached objects, above max_bytes the least recently used objects are removed down to
+        EVICT_TO * max_bytes (a full cache is not walked again on the next store)
+        """
+        list_objects = []
+        for path_root, list_dirs, list_files in os.walk(self.path_dir):
+            for name in list_files:
+                if name.endswith(".tmp"):
+                    continue
+                path_object = os.path.join(path_root, name)
+                try:
+                    stat = os.stat(path_object)
+                except FileNotFoundError:       # evicted by another process
+                    continue
+                list_objects.append((stat.st_mtime_ns, stat.st_size, path_object))
+        total = sum(size for mtime_ns, size, path_object in list_objects)
+        if total > self.max_bytes:
+            for mtime_ns, size, path_object in sorted(list_objects):
+                if total <= self.max_bytes * EVICT_TO:
+                    break
+                try:
+                    os.remove(path_object)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                with self._lock:
+                    self.evictions += 1
+        with self._lock:
+            self._size = total
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "hit_rate": round(self.hits / lookups, 4) if lookups else None}
+
+    def clear(self):
+        shutil.rmtree(self.path_dir, ignore_errors=True)
+        os.makedirs(self.path_dir, exist_ok=True)
+        with self._lock:
+            self._size = 0
+
+
+# process-wide cache (off unless configured)
+# ______________________________________________________________________________________________________________________
+_active = {"cache": None, "env": None}
+
+
+def configure(path_dir: str = None, max_mb: float = DEFAULT_MAX_MB, link: bool = False):
+    """
+    Turns the render cache on for all logos of this process
+
+    Returns
+    _______
+    render_cache : RenderCache
+    """
+    _active["cache"] = RenderCache(path_dir, max_bytes=int(max_mb * (1 << 20)), link=link)
+    return _active["cache"]
+
+
+def disable():
+    _active["cache"] = None
+    _active["env"] = ""
+
+
+def active_cache():
+    """
+    Returns
+    _______
+    render_cache : RenderCache of configure() or of AALOGO_RENDER_CACHE, None --> cache off
+    """
+    if _active["cache"] is None and _active["env"] is None:
+        _active["env"] = os.environ.get("AALOGO_RENDER_CACHE", "")
+        if _active["env"]:
+            configure(None if _active["env"] == "1" else _active["env"],
+                      max_mb=float(os.environ.get("AALOGO_RENDER_CACHE_MB", DEFAULT_MAX_MB)),
+                      link=os.environ.get("AALOGO_RENDER_CACHE_LINK", "") == "1")
+    return _active["cache"]
+
+
+def stats():
+    """
+    Hits / misses of this process, None --> cache off
+    """
+    render_cache = active_cache()
+    return None if render_cache is None else render_cache.stats()
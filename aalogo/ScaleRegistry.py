@@ -0,0 +1,154 @@
+# standard libs
+import os
+import json
+import hashlib
+import threading
+# intern
+from aalogo import StandardConfig
+
+
+# hydrophobicity scales (grad_scales/scales_hydrophobicity.xlsx) compiled once into a JSON sidecar
+# ______________________________________________________________________________________________________________________
+# sidecar (dict)
+#   "version" : SIDECAR_VERSION
+#   "source" : {"path", "mtime_ns", "size", "sha256"} of the compiled .xlsx
+#   "themes" : {theme: {"order": amino acids sorted by the scale (high to low), "values": sorted scale values}}
+#   the values are normalized by GetAA.aa_color_palette (same as a color_advance of the user)
+SIDECAR_VERSION = 1
+DEFAULT_THEME = "Kyte-Doolittle"
+
+
+def scales_path():
+    """
+    Returns
+    _______
+    path of scales_hydrophobicity.xlsx
+    """
+    sep = StandardConfig.find_folderpath()[1]
+    path_file = os.path.abspath(os.path.dirname(__file__))
+    return f"{path_file.split("aalogo")[0]}grad_scales{sep}scales_hydrophobicity.xlsx"
+
+
+def _file_sha256(path):
+    sha = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def compile_scales(path_xlsx: str):
+    """
+    Reads the scale table once and presorts every theme (same ordering as the former per call pd.read_excel)
+
+    Returns
+    _______
+    dict_themes : {theme: {"order", "values"}}, see sidecar description above
+    """
+    import pandas as pd                         # only needed (with openpyxl) when the sidecar is outdated
+
+    data_hydrophobicity_scales = pd.read_excel(path_xlsx)
+    dict_themes = {}
+    for theme in data_hydrophobicity_scales.columns.tolist()[2:]:
+        theme_df = (data_hydrophobicity_scales[["aa_code", theme]].sort_values(by=theme, ascending=False)
+                    .reset_index().drop("index", axis=1))
+        values = [float(value) for value in theme_df[theme]]
+        dict_themes[theme] = {"order": [str(aa) for aa in theme_df["aa_code"]], "values": values}
+    return dict_themes
+
+
+class ScaleRegistry:
+    """
+    In memory hydrophobicity themes, loaded from the JSON sidecar in the user cache directory
+    the sidecar is rebuilt from the .xlsx if its mtime / size changed and the sha256 does not match anymore
+    """
+
+    def __init__(self, path_xlsx: str = None, path_sidecar: str = None):
+        self.path_xlsx = path_xlsx
+        self.path_sidecar = path_sidecar
+        self._themes = None
+        self._lock = threading.Lock()
+
+    def _paths(self):
+        path_xlsx = self.path_xlsx or scales_path()
+        path_sidecar = self.path_sidecar
+        if path_sidecar is None:
+            path_sidecar = os.path.join(StandardConfig.cache_directory(), "scales_hydrophobicity.json")
+        return path_xlsx, path_sidecar
+
+    def _load(self):
+        path_xlsx, path_sidecar = self._paths()
+        stat = os.stat(path_xlsx)
+        source = {"path": os.path.abspath(path_xlsx), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+        sidecar = None
+        try:
+            with open(path_sidecar, "r") as file_json:
+                sidecar = json.load(file_json)
+        except (OSError, ValueError):
+            pass
+
+        if sidecar is not None and sidecar.get("version") == SIDECAR_VERSION:
+            cached = sidecar["source"]
+            if all(cached.get(key) == source[key] for key in source):
+                return sidecar["themes"]
+            source["sha256"] = _file_sha256(path_xlsx)
+            if cached.get("sha256") == source["sha256"]:      # touched / copied, same content
+                self._write(path_sidecar, {**sidecar, "source": source})
+                return sidecar["themes"]
+
+        source["sha256"] = source.get("sha256") or _file_sha256(path_xlsx)
+        dict_themes = compile_scales(path_xlsx)
+        self._write(path_sidecar, {"version": SIDECAR_VERSION, "source": source, "themes": dict_themes})
+        return dict_themes
+
+    @staticmethod
+    def _write(path_sidecar, sidecar):
+        # write + rename, parallel processes never read a half written sidecar
+        path_tmp = f"{path_sidecar}.{os.getpid()}.tmp"
+        try:
+            with open(path_tmp, "w") as file_json:
+                json.dump(sidecar, file_json)
+            os.replace(path_tmp, path_sidecar)
+        except OSError:
+            pass                                # read only cache --> themes stay in memory only
+
+    @property
+    def themes(self):
+        if self._themes is None:
+            with self._lock:
+                if self._themes is None:
+                    self._themes = self._load()
+        return self._themes
+
+    def available_themes(self):
+        return list(self.themes)
+
+    def get(self, theme: str):
+        """
+        Parameters
+        __________
+        theme : scale name (column of scales_hydrophobicity.xlsx), unknown --> DEFAULT_THEME
+
+        Returns
+        _______
+        dict_theme : {"order", "values"} (shared, do not modify)
+        """
+        return self.themes.get(theme, self.themes[DEFAULT_THEME])
+
+    def reload(self):
+        with self._lock:
+            self._themes = None
+
+
+# process-wide instance
+# ______________________________________________________________________________________________________________________
+scale_registry = ScaleRegistry()
+
+
+def available_themes():
+    return scale_registry.available_themes()
+
+
+def get_theme(theme):
+    return scale_registry.get(theme)
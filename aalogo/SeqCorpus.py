@@ -0,0 +1,261 @@
+# standard libs
+import os
+import csv
+import json
+import numpy as np
+# intern
+from aalogo import SeqEngine
+from aalogo import SeqStream
+
+
+# memory mapped corpus: directory with MMAP_MANIFEST and raw .npy arrays, opened read only with np.load(mmap_mode="r")
+#   buffer.npy (uint8 codes), offsets.npy (int64), anchors.npy (float64, anchor columns x sequences, optional),
+#   names.npy (str, optional), rejected.npy (bool, optional), groups.npy (int64, group columns x sequences, optional),
+#   corpus.json {"version", "sequences", "residues", "anchors": [column names], "names", "rejected",
+#                "groups": {group column: [labels]}}
+# processes mapping the same directory share one physical copy (page cache), pickles only carry the path
+MMAP_VERSION = 1
+MMAP_MANIFEST = "corpus.json"
+
+
+class SequenceCorpus:
+    """
+    Encoded amino acid sequences: one contiguous uint8 buffer (SeqEngine codes) plus int64 offsets
+    sequence i is buffer[offsets[i]:offsets[i+1]], normalization (upper case, U --> S) is done while encoding
+    optional anchors: {anchor column: float64 array}, alignment positions stored with the sequences
+    optional groups: {group column: (int64 codes, sorted labels)}, categorical columns (code -1 --> no group)
+    rejected rows (SeqEngine.validate_sequences) are empty and never give a window, report tells why
+    """
+
+    def __init__(self, buffer: np.ndarray, offsets: np.ndarray, names: list = None, anchors: dict = None,
+                 rejected: np.ndarray = None, report: dict = None, groups: dict = None):
+        self.buffer = buffer
+        self.offsets = offsets
+        self.names = names
+        self.anchors = {} if anchors is None else anchors
+        self.groups = {} if groups is None else groups
+        self.rejected = rejected if rejected is not None and rejected.any() else None
+        self.report = report                    # validation report of the constructor, None if loaded
+        self.path_mmap = None                   # set by open_mmap
+        if names is not None and len(names) != len(self):
+            raise ValueError(f"{len(names)} names given for {len(self)} sequences")
+        for column, values in self.anchors.items():
+            if len(values) != len(self):
+                raise ValueError(f"{len(values)} anchors in {column} given for {len(self)} sequences")
+        for column, (codes, labels) in self.groups.items():
+            if len(codes) != len(self):
+                raise ValueError(f"{len(codes)} group codes in {column} given for {len(self)} sequences")
+
+    # constructors
+    # __________________________________________________________________________________________________________________
+    @classmethod
+    def from_sequences(cls, list_seq, names: list = None, policy: str = "mask"):
+        """
+        policy : handling of sequences with residues that are no amino acids ("mask", "drop", "raise"),
+                 see SeqEngine.validate_sequences, entries that are no str are always rejected (or raised)
+        """
+        buffer, offsets, rejected, report = SeqEngine.validate_sequences(list_seq, policy=policy)
+        return cls(buffer, offsets, names=None if names is None else list(names), rejected=rejected, report=report)
+
+    @classmethod
+    def from_dataframe(cls, df, column_seq: str, column_name: str = None, columns_anchor: list = None,
+                       policy: str = "mask", columns_group: list = None):
+        """
+        columns_anchor : anchor columns stored with the sequences (entries that are no numbers --> NaN)
+        policy : see from_sequences
+        columns_group : categorical columns stored as group codes (e.g. for AAlogoMaker group_by)
+        """
+        import pandas as pd
+
+        names = None if column_name is None else df[column_name].astype(str).tolist()
+        corpus = cls.from_sequences(df[column_seq], names=names, policy=policy)
+        for column in columns_anchor or []:
+            corpus.anchors[column] = SeqEngine.as_anchors(df[column].tolist())
+        for column in columns_group or []:
+            codes, labels = pd.factorize(df[column], sort=True)
+            corpus.groups[column] = codes.astype(np.int64), labels.tolist()
+        return corpus
+
+    @classmethod
+    def from_fasta(cls, path_fasta: str):
+        names, list_seq = [], []
+        for header, seq in SeqStream.iter_fasta(path_fasta):
+            names.append(header)
+            list_seq.append(seq)
+        return cls.from_sequences(list_seq, names=names)
+
+    @classmethod
+    def from_csv(cls, path_csv: str, column_seq: str, column_name: str = None, delimiter: str = ","):
+        names, list_seq = [], []
+        with open(path_csv, "r", newline="") as file_csv:
+            for row in csv.DictReader(file_csv, delimiter=delimiter):
+                list_seq.append(row[column_seq])
+                if column_name is not None:
+                    names.append(row[column_name])
+        return cls.from_sequences(list_seq, names=names if column_name is not None else None)
+
+    # persistence
+    # __________________________________________________________________________________________________________________
+    def _group_labels(self):
+        # labels as JSON values, other types (e.g. dates) as str
+        return {column: [label if isinstance(label, (str, int, float)) else str(label) for label in labels]
+                for column, (codes, labels) in self.groups.items()}
+
+    def save(self, path_corpus: str):
+        """
+        Saves the corpus (with anchors, groups and names) as .npz (numpy adds the suffix if missing),
+        same arrays as save_mmap, the anchor / group column names and group labels are stored as JSON text
+        """
+        dict_arrays = {"buffer": self.buffer, "offsets": self.offsets}
+        if self.anchors:
+            dict_arrays["anchors"] = np.stack([np.asarray(values, dtype=np.float64)
+                                               for values in self.anchors.values()])
+            dict_arrays["anchor_columns"] = np.array(json.dumps(list(self.anchors)))
+        if self.names is not None:
+            dict_arrays["names"] = np.array(self.names, dtype=str)
+        if self.rejected is not None:
+            dict_arrays["rejected"] = self.rejected
+        if self.groups:
+            dict_arrays["groups"] = np.stack([np.asarray(codes, dtype=np.int64) for codes, _ in self.groups.values()])
+            dict_arrays["group_labels"] = np.array(json.dumps(self._group_labels()))
+        np.savez(path_corpus, **dict_arrays)
+
+    @classmethod
+    def load(cls, path_corpus: str):
+        with np.load(path_corpus) as data:
+            names = data["names"].tolist() if "names" in data.files else None
+            rejected = data["rejected"] if "rejected" in data.files else None
+            anchors = {}
+            if "anchors" in data.files:
+                anchors = dict(zip(json.loads(str(data["anchor_columns"])), data["anchors"]))
+            groups = {}
+            if "groups" in data.files:
+                groups = {column: (codes, labels) for (column, labels), codes in
+                          zip(json.loads(str(data["group_labels"])).items(), data["groups"])}
+            return cls(data["buffer"], data["offsets"], names=names, anchors=anchors, rejected=rejected,
+                       groups=groups)
+
+    def save_mmap(self, path_dir: str):
+        """
+        Saves the corpus (with anchors, groups and names) as memory mappable directory, see open_mmap
+        """
+        os.makedirs(path_dir, exist_ok=True)
+        np.save(os.path.join(path_dir, "buffer.npy"), np.ascontiguousarray(self.buffer, dtype=np.uint8))
+        np.save(os.path.join(path_dir, "offsets.npy"), np.ascontiguousarray(self.offsets, dtype=np.int64))
+        columns_anchor = list(self.anchors)
+        if columns_anchor:
+            np.save(os.path.join(path_dir, "anchors.npy"),
+                    np.stack([np.asarray(self.anchors[column], dtype=np.float64) for column in columns_anchor]))
+        if self.names is not None:
+            np.save(os.path.join(path_dir, "names.npy"), np.array(self.names, dtype=str))
+        if self.rejected is not None:
+            np.save(os.path.join(path_dir, "rejected.npy"), self.rejected)
+        columns_group = list(self.groups)
+        if columns_group:
+            np.save(os.path.join(path_dir, "groups.npy"),
+                    np.stack([np.asarray(self.groups[column][0], dtype=np.int64) for column in columns_group]))
+        dict_manifest = {"version": MMAP_VERSION, "sequences": len(self), "residues": int(self.buffer.size),
+                         "anchors": columns_anchor, "names": self.names is not None,
+                         "rejected": self.rejected is not None, "groups": self._group_labels()}
+        # manifest last --> a directory with manifest is complete
+        with open(os.path.join(path_dir, MMAP_MANIFEST), "w") as file_json:
+            json.dump(dict_manifest, file_json, indent=2)
+        return path_dir
+
+    @classmethod
+    def open_mmap(cls, path_dir: str):
+        """
+        Opens a save_mmap directory read only, buffer, offsets and anchors stay on disk (np.memmap) and are paged
+        in on access, the windows are cut directly from the mapped buffer
+        """
+        path_dir = os.path.abspath(path_dir)
+        with open(os.path.join(path_dir, MMAP_MANIFEST), "r") as file_json:
+            dict_manifest = json.load(file_json)
+        if dict_manifest.get("version") != MMAP_VERSION:
+            raise ValueError(f"{path_dir} has corpus version {dict_manifest.get('version')}, "
+                             f"{MMAP_VERSION} is needed")
+        buffer = np.load(os.path.join(path_dir, "buffer.npy"), mmap_mode="r")
+        offsets = np.load(os.path.join(path_dir, "offsets.npy"), mmap_mode="r")
+        anchors = {}
+        if dict_manifest["anchors"]:
+            anchor_sets = np.load(os.path.join(path_dir, "anchors.npy"), mmap_mode="r")
+            anchors = dict(zip(dict_manifest["anchors"], anchor_sets))
+        names = None
+        if dict_manifest["names"]:
+            names = np.load(os.path.join(path_dir, "names.npy"), mmap_mode="r")
+        rejected = None
+        if dict_manifest.get("rejected"):
+            rejected = np.load(os.path.join(path_dir, "rejected.npy"))
+        groups = {}
+        if dict_manifest.get("groups"):
+            group_sets = np.load(os.path.join(path_dir, "groups.npy"), mmap_mode="r")
+            groups = {column: (codes, labels) for (column, labels), codes in zip(dict_manifest["groups"].items(),
+                                                                               group_sets)}
+        corpus = cls(buffer, offsets, names=names, anchors=anchors, rejected=rejected, groups=groups)
+        corpus.path_mmap = path_dir
+        return corpus
+
+    @staticmethod
+    def is_mmap(path_dir: str):
+        return os.path.isfile(os.path.join(path_dir, MMAP_MANIFEST))
+
+    def __reduce_ex__(self, protocol):
+        # a mapped corpus is sent to other processes as its path, every process maps the same files
+        if self.path_mmap is not None:
+            return type(self).open_mmap, (self.path_mmap,)
+        return super().__reduce_ex__(protocol)
+
+    # access
+    # __________________________________________________________________________________________________________________
+    def __len__(self):
+        return self.offsets.size - 1
+
+    @property
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    def sequence(self, index: int):
+        """
+        Decoded (normalized) sequence of row index
+        """
+        codes = self.buffer[self.offsets[index]:self.offsets[index + 1]]
+        return SeqEngine.DECODE_LUT[codes].tobytes().decode("ascii")
+
+    # window extraction and counting
+    # __________________________________________________________________________________________________________________
+    def _valid_anchors(self, anchors):
+        # rejected rows --> NaN anchor, removed like anchors < 1
+        if self.rejected is None:
+            return anchors
+        return np.where(self.rejected, np.nan, anchors)
+
+    def extract_windows(self, anchors, length_right: int, length_left: int, start_pos: bool = True):
+        """
+        see SeqEngine.extract_windows, anchors must have one entry per sequence
+        """
+        anchors = np.asarray(anchors, dtype=np.float64)
+        if anchors.size != len(self):
+            raise ValueError(f"{anchors.size} anchors given for {len(self)} sequences")
+        anchors = self._valid_anchors(anchors)
+        return SeqEngine.extract_windows(self.buffer, self.offsets, anchors, length_right, length_left,
+                                         start_pos=start_pos)
+
+    def count_windows(self, anchors, length_right: int, length_left: int, start_pos: bool = True):
+        """
+        Count matrix (SeqEngine.count_windows) of the windows around the anchors
+        """
+        windows = self.extract_windows(anchors, length_right, length_left, start_pos=start_pos)[0]
+        return SeqEngine.count_windows(windows)
+
+    def count_anchor_sets(self, anchor_sets, lengths_right, lengths_left, list_start_pos, groups=None,
+                          n_groups: int = None):
+        """
+        Count matrices of several anchor columns in one pass (SeqEngine.count_anchor_sets),
+        anchor_sets has one row per anchor column and one entry per sequence, groups one code per sequence
+        """
+        anchor_sets = np.atleast_2d(np.asarray(anchor_sets, dtype=np.float64))
+        if anchor_sets.shape[1] != len(self):
+            raise ValueError(f"{anchor_sets.shape[1]} anchors given for {len(self)} sequences")
+        anchor_sets = self._valid_anchors(anchor_sets)
+        return SeqEngine.count_anchor_sets(self.buffer, self.offsets, anchor_sets, lengths_right, lengths_left,
+                                           list_start_pos, groups=groups, n_groups=n_groups)
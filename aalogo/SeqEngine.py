@@ -0,0 +1,312 @@
+# standard libs
+import numpy as np
+
+
+# amino acid encoding
+# ______________________________________________________________________________________________________________________
+AA_ALPHABET = "ACDEFGHIKLMNPQRSTVWY"        # canonical amino acids, code 0 to 19
+GAP_CODE = len(AA_ALPHABET)                 # "-" and out of range positions, code 20
+N_CODES = GAP_CODE + 1
+
+
+def _build_code_lut():
+    """
+    Byte lookup table (ASCII --> amino acid code), upper/lower case and U (Selenocysteine) --> S (Serine)
+    """
+    lut = np.full(256, GAP_CODE, dtype=np.uint8)
+    for code, aa in enumerate(AA_ALPHABET):
+        lut[ord(aa)] = code
+        lut[ord(aa.lower())] = code
+    lut[ord("U")] = lut[ord("u")] = AA_ALPHABET.index("S")
+    return lut
+
+
+CODE_LUT = _build_code_lut()
+DECODE_LUT = np.frombuffer(f"{AA_ALPHABET}-".encode("ascii"), dtype=np.uint8)
+
+
+# encoding and window extraction
+# ______________________________________________________________________________________________________________________
+def _encode(list_seq: list):
+    """
+    Returns
+    _______
+    buffer, offsets : see encode_sequences
+    raw : uint8 array with the ASCII bytes of buffer, lengths : int64 array with the sequence lengths
+    """
+    lengths = np.fromiter(map(len, list_seq), dtype=np.int64, count=len(list_seq))
+    offsets = np.zeros(len(list_seq) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+
+    # "replace" keeps one byte per character, non-ASCII letters become "?" --> gap code
+    raw = np.frombuffer("".join(list_seq).encode("ascii", errors="replace"), dtype=np.uint8)
+    return CODE_LUT[raw], offsets, raw, lengths
+
+
+def encode_sequences(list_seq):
+    """
+    Encodes all sequences at once into one contiguous code buffer
+
+    Parameters
+    __________
+    list_seq : iterable of amino acid sequences (str)
+
+    Returns
+    _______
+    buffer : uint8 array with the amino acid codes of all sequences concatenated
+    offsets : int64 array (len(list_seq) + 1), sequence i is buffer[offsets[i]:offsets[i+1]]
+    """
+    list_seq = list(list_seq)
+    for seq in list_seq:
+        if not isinstance(seq, str):
+            raise TypeError(f"Input Sequence is not str type: {seq!r}")
+    buffer, offsets = _encode(list_seq)[:2]
+    return buffer, offsets
+
+
+# batch validation
+# ______________________________________________________________________________________________________________________
+# accepted bytes: the 20 canonical amino acids (upper / lower case), U / u (read as S) and "-" (gap),
+# every other byte is mapped to GAP_CODE by CODE_LUT --> invalid residues are the gap codes that are no "-"
+POLICIES = ["mask", "drop", "raise"]
+
+
+def validate_sequences(list_seq, policy: str = "mask", max_rows: int = None):
+    """
+    Classifies all sequences at once (byte lookup table) and encodes them according to the policy
+
+    Parameters
+    __________
+    list_seq : iterable of amino acid sequences, entries that are no str (e.g. NaN of empty table cells) are rejected
+    policy : "mask" --> residues that are no amino acids become gaps, the sequence is kept
+             "drop" --> sequences with such residues are rejected
+             "raise" --> ValueError (TypeError for entries that are no str) listing the offending rows
+    max_rows : number of offending row indices kept per reason in the report, None --> all
+
+    Returns
+    _______
+    buffer, offsets : see encode_sequences, rejected rows are empty (row i still pairs with anchor i)
+    rejected : bool array (len(list_seq)), True for rejected rows (their windows are removed)
+    report : {"sequences", "rejected", "masked_residues", "policy",
+              "reasons": {reason: number of rows}, "rows": {reason: int64 array of row indices},
+              "characters": {offending character: count}}, reasons "not_str" and "invalid_residues"
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"{policy} is not a validation policy ({', '.join(POLICIES)})")
+    list_seq = list(list_seq)
+    is_str = np.fromiter((isinstance(seq, str) for seq in list_seq), dtype=bool, count=len(list_seq))
+    if not is_str.all():
+        list_seq = [seq if ok else "" for seq, ok in zip(list_seq, is_str.tolist())]
+    buffer, offsets, raw, lengths = _encode(list_seq)
+
+    position_gap = np.flatnonzero(buffer == GAP_CODE)
+    position_invalid = position_gap[raw[position_gap] != ord("-")]
+    rows_invalid = np.unique(np.searchsorted(offsets, position_invalid, side="right") - 1)
+    rows_not_str = np.flatnonzero(~is_str)
+    characters, counts = np.unique(raw[position_invalid], return_counts=True)
+    report = {"sequences": len(list_seq), "rejected": 0, "masked_residues": 0, "policy": policy,
+              "reasons": {"not_str": int(rows_not_str.size), "invalid_residues": int(rows_invalid.size)},
+              "rows": {"not_str": rows_not_str[:max_rows], "invalid_residues": rows_invalid[:max_rows]},
+              "characters": {chr(char): int(count) for char, count in zip(characters.tolist(), counts.tolist())}}
+
+    if policy == "raise" and rows_not_str.size:
+        raise TypeError(f"Input Sequence is not str type in {rows_not_str.size} rows: {rows_not_str[:10].tolist()}")
+    if policy == "raise" and rows_invalid.size:
+        raise ValueError(f"{rows_invalid.size} sequences contain residues that are no amino acids "
+                         f"{report['characters']}, rows: {rows_invalid[:10].tolist()}")
+
+    rejected = ~is_str
+    if policy == "drop" and rows_invalid.size:
+        rejected = rejected.copy()
+        rejected[rows_invalid] = True
+        # rejected rows become empty, the other residues keep their order
+        buffer = buffer[np.repeat(~rejected, lengths)]
+        lengths = np.where(rejected, 0, lengths)
+        np.cumsum(lengths, out=offsets[1:])
+    else:
+        report["masked_residues"] = int(position_invalid.size)
+    report["rejected"] = int(rejected.sum())
+    return buffer, offsets, rejected, report
+
+
+def as_anchors(anchors):
+    """
+    Alignment positions as float array, entries that are no numbers --> NaN (removed by extract_windows)
+    """
+    try:
+        return np.asarray(anchors, dtype=np.float64)
+    except (TypeError, ValueError):
+        import pandas as pd                     # mixed input (e.g. text columns), parsed like pd.to_numeric
+        return pd.to_numeric(pd.Series(list(anchors)), errors="coerce").to_numpy(dtype=np.float64)
+
+
+def extract_windows(buffer, offsets, anchors, length_right, length_left, start_pos=True, chunk_size=1 << 16):
+    """
+    Cuts the left/right windows around the anchors of all sequences with one gather per chunk
+
+    Parameters
+    __________
+    buffer : code buffer from encode_sequences
+    offsets : offsets from encode_sequences
+    anchors : 1-based alignment positions (one per sequence), rows with anchors < 1 (or NaN) are removed
+    length_right : window size right of the anchor
+    length_left : window size left of the anchor
+    start_pos : True --> anchor is the first residue of the right side (start position)
+                False --> anchor is the last residue of the left side (stop position)
+    chunk_size : number of rows gathered at once (bounds the size of the index matrix)
+
+    Returns
+    _______
+    windows : uint8 array (kept rows, length_left + length_right) of amino acid codes, out of range --> GAP_CODE
+    kept : bool array (len(anchors)), False for removed rows
+    """
+    length_right, length_left = int(length_right), int(length_left)
+    anchors = np.asarray(anchors, dtype=np.float64)
+    with np.errstate(invalid="ignore"):
+        kept = anchors >= 1
+
+    # first residue of the window (0-based, may be negative)
+    base = anchors[kept].astype(np.int64) - length_left
+    if start_pos:
+        base -= 1
+    starts = offsets[:-1][kept]
+    lengths = offsets[1:][kept] - starts
+
+    width = length_left + length_right
+    steps = np.arange(width, dtype=np.int64)
+    windows = np.full((base.size, width), GAP_CODE, dtype=np.uint8)
+    if buffer.size == 0:
+        return windows, kept
+
+    for begin in range(0, base.size, chunk_size):
+        stop = begin + chunk_size
+        positions = base[begin:stop, None] + steps
+        in_range = (positions >= 0) & (positions < lengths[begin:stop, None])
+        index = np.clip(positions + starts[begin:stop, None], 0, buffer.size - 1)
+        chunk = buffer[index]
+        chunk[~in_range] = GAP_CODE
+        windows[begin:stop] = chunk
+    return windows, kept
+
+
+# counting kernel
+# ______________________________________________________________________________________________________________________
+def count_windows(windows):
+    """
+    Position resolved amino acid counts of encoded windows (one bincount pass)
+
+    Parameters
+    __________
+    windows : uint8 array (number of windows, window width) from extract_windows
+
+    Returns
+    _______
+    counts : int64 array (N_CODES, window width), row = amino acid code (GAP_CODE last), column = position
+    """
+    width = windows.shape[1]
+    flat = windows.astype(np.intp) * width + np.arange(width, dtype=np.intp)
+    return np.bincount(flat.ravel(), minlength=N_CODES * width).reshape(N_CODES, width)
+
+
+def count_anchor_sets(buffer, offsets, anchor_sets, lengths_right, lengths_left, list_start_pos,
+                      chunk_elements=1 << 16, groups=None, n_groups: int = None):
+    """
+    Count matrices of several anchor columns in one pass over the sequences, the windows of all anchors of a
+    chunk of sequences are gathered and counted together (no per anchor window matrix), optionally split by
+    group (one count matrix per anchor column and group, same single bincount per chunk)
+
+    Parameters
+    __________
+    buffer : code buffer from encode_sequences
+    offsets : offsets from encode_sequences
+    anchor_sets : float array (number of anchor columns, sequences), see extract_windows
+    lengths_right : window size right of the anchor, one per anchor column
+    lengths_left : window size left of the anchor, one per anchor column
+    list_start_pos : orientation (see extract_windows), one per anchor column
+    chunk_elements : window positions gathered at once (bounds the size of the index tensor)
+    groups : int array (sequences), group code per sequence (0 to n_groups - 1), negative --> row is not counted
+    n_groups : number of groups, None --> groups.max() + 1
+
+    Returns
+    _______
+    counts : int64 array (anchor columns, N_CODES, window width), same as count_windows per column,
+             with groups (anchor columns, groups, N_CODES, window width)
+    kept : bool array (anchor columns, sequences), False for removed rows (no valid anchor)
+    """
+    anchor_sets = np.atleast_2d(np.asarray(anchor_sets, dtype=np.float64))
+    n_sets = anchor_sets.shape[0]
+    shape_groups = ()
+    if groups is not None:
+        groups = np.asarray(groups, dtype=np.intp)
+        if groups.shape != anchor_sets.shape[1:]:
+            raise ValueError(f"{groups.size} group codes given for {anchor_sets.shape[1]} sequences")
+        n_groups = int(groups.max(initial=-1)) + 1 if n_groups is None else int(n_groups)
+        if groups.size and groups.max() >= n_groups:
+            raise ValueError(f"group codes need to be less than n_groups ({n_groups})")
+        shape_groups = (n_groups,)
+    lengths_right = np.asarray(lengths_right, dtype=np.int64)
+    lengths_left = np.asarray(lengths_left, dtype=np.int64)
+    widths = lengths_left + lengths_right
+    if not (lengths_right.size == lengths_left.size == len(list_start_pos) == n_sets):
+        raise ValueError("one window size and orientation is needed per anchor column")
+    if np.unique(widths).size > 1:
+        raise ValueError(f"anchor columns need the same window width, got {widths.tolist()}")
+    width = int(widths[0]) if n_sets else 0
+    counts = np.zeros((n_sets, *shape_groups, N_CODES, width), dtype=np.int64)
+    with np.errstate(invalid="ignore"):
+        kept = anchor_sets >= 1
+    if n_sets == 0 or width == 0 or buffer.size == 0 or counts.size == 0:
+        return counts, kept
+
+    # first residue of every window (0-based, may be negative), rows without anchor stay out of the counts
+    shift = (lengths_left + np.asarray(list_start_pos, dtype=np.int64))[:, None]
+    base = np.where(kept, np.nan_to_num(anchor_sets).astype(np.int64) - shift, 0).T      # (sequences, sets)
+    kept_rows = kept.T
+    starts, lengths = offsets[:-1], np.diff(offsets)
+    steps = np.arange(width, dtype=np.int64)
+    # bin of (anchor column, position), the group and the code are added while counting
+    n_groups = shape_groups[0] if shape_groups else 1
+    bins = (np.arange(n_sets, dtype=np.intp)[:, None] * n_groups * N_CODES * width + steps)[None]
+    n_bins = n_sets * n_groups * N_CODES * width
+    if groups is not None:
+        kept_rows = kept_rows & (groups >= 0)[:, None]
+    # each bincount allocates all bins --> chunks of at least n_bins positions with many groups
+    chunk_size = max(1, max(chunk_elements, n_bins) // (n_sets * width))
+
+    for begin in range(0, base.shape[0], chunk_size):
+        stop = begin + chunk_size
+        positions = base[begin:stop, :, None] + steps
+        in_range = (positions >= 0) & (positions < lengths[begin:stop, None, None])
+        index = np.clip(positions + starts[begin:stop, None, None], 0, buffer.size - 1)
+        codes = buffer[index]
+        codes[~in_range] = GAP_CODE
+        flat = codes.astype(np.intp)
+        flat *= width
+        flat += bins
+        if groups is not None:
+            flat += (groups[begin:stop] * (N_CODES * width))[:, None, None]
+        flat[~kept_rows[begin:stop]] = n_bins                   # removed rows --> overflow bin
+        counts += np.bincount(flat.ravel(), minlength=n_bins + 1)[:n_bins].reshape(counts.shape)
+    return counts, kept
+
+
+def propensities(counts):
+    """
+    Normalizes a count matrix column wise (amino acids and gaps of one position add up to 1)
+    """
+    totals = counts.sum(axis=0)
+    return np.divide(counts, totals, out=np.zeros(counts.shape, dtype=np.float64), where=totals > 0)
+
+
+def gap_fraction(counts):
+    """
+    Fraction of gaps ("-", out of range or non-canonical residues) per position
+    """
+    return propensities(counts)[GAP_CODE]
+
+
+def aa_codes(aa_list):
+    """
+    Amino acid codes (row indices of the count matrix) for a given amino acid order
+    """
+    return np.array([AA_ALPHABET.index(aa) for aa in aa_list], dtype=np.intp)
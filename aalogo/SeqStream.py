@@ -0,0 +1,179 @@
+# standard libs
+import csv
+import numpy as np
+# intern
+from aalogo import LogoMetrics
+from aalogo import SeqEngine
+from aalogo.StandardConfig import timingmethod
+
+
+# record readers (generators, one record in memory at a time)
+# ______________________________________________________________________________________________________________________
+def iter_fasta(path_fasta: str):
+    """
+    Reads a FASTA file record by record
+
+    Returns
+    _______
+    generator of (header without ">", sequence)
+    """
+    header, list_lines = None, []
+    with open(path_fasta, "r") as fasta:
+        for line in fasta:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith(">"):
+                if header is not None:
+                    yield header, "".join(list_lines)
+                header, list_lines = line[1:], []
+            else:
+                list_lines.append(line)
+    if header is not None:
+        yield header, "".join(list_lines)
+
+
+def iter_table(path_table: str, column_seq: str, column_anchor: str, delimiter: str = "\t"):
+    """
+    Reads a delimited text file (TSV by default) row by row
+
+    Returns
+    _______
+    generator of (sequence, anchor), anchor is NaN if empty or not a number
+    """
+    with open(path_table, "r", newline="") as file_table:
+        for row in csv.DictReader(file_table, delimiter=delimiter):
+            yield row[column_seq], _to_anchor(row[column_anchor])
+
+
+def header_fields(header: str):
+    """
+    key=value tokens of a FASTA header, e.g. ">sp|P05067 start_pos_TMD=700 stop_pos_TMD=723"
+
+    Returns
+    _______
+    dict_fields : {key: value}, first token (sequence id) under "id"
+    """
+    tokens = header.split()
+    dict_fields = {"id": tokens[0] if tokens else ""}
+    for token in tokens[1:]:
+        key, is_field, value = token.partition("=")
+        if is_field:
+            dict_fields[key] = value
+    return dict_fields
+
+
+def read_anchor_table(path_table: str, column_id: str, column_anchor: str, delimiter: str = "\t"):
+    """
+    Side table of anchors (sequence id --> alignment position), small compared to the sequences
+
+    Returns
+    _______
+    dict_anchors : {sequence id: anchor}
+    """
+    with open(path_table, "r", newline="") as file_table:
+        return {row[column_id]: _to_anchor(row[column_anchor])
+                for row in csv.DictReader(file_table, delimiter=delimiter)}
+
+
+def iter_fasta_anchored(path_fasta: str, anchor_key: str = None, dict_anchors: dict = None):
+    """
+    FASTA records paired with their anchor, from the header (anchor_key=value) or from a side table (dict_anchors,
+    key = first header token), records without anchor get NaN and are removed while counting
+
+    Returns
+    _______
+    generator of (sequence, anchor)
+    """
+    if (anchor_key is None) == (dict_anchors is None):
+        raise ValueError("give either anchor_key (anchor in the header) or dict_anchors (side table)")
+    for header, seq in iter_fasta(path_fasta):
+        dict_fields = header_fields(header)
+        if dict_anchors is not None:
+            yield seq, dict_anchors.get(dict_fields["id"], np.nan)
+        else:
+            yield seq, _to_anchor(dict_fields.get(anchor_key))
+
+
+def _to_anchor(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+# streaming counts
+# ______________________________________________________________________________________________________________________
+@timingmethod
+def count_stream(records, length_right: int, length_left: int, start_pos: bool = True, batch_size: int = 4096):
+    """
+    Folds (sequence, anchor) records batch wise into one count matrix, memory is bounded by batch_size
+    instead of the input size
+
+    Parameters
+    __________
+    records : iterable of (sequence, anchor), e.g. iter_table() or iter_fasta_anchored()
+    length_right : window size right of the anchor
+    length_left : window size left of the anchor
+    start_pos : see SeqEngine.extract_windows
+    batch_size : number of records encoded and counted at once
+
+    Returns
+    _______
+    counts : int64 array (SeqEngine.N_CODES, length_left + length_right), same as SeqEngine.count_windows
+    n_removed : number of records without a valid anchor (< 1 or missing)
+    """
+    counts = np.zeros((SeqEngine.N_CODES, int(length_left) + int(length_right)), dtype=np.int64)
+    n_removed = 0
+    list_seq, list_anchors = [], []
+
+    def fold():
+        buffer, offsets = SeqEngine.encode_sequences(list_seq)
+        windows, kept = SeqEngine.extract_windows(buffer, offsets, list_anchors, length_right, length_left,
+                                                  start_pos=start_pos)
+        counts[...] += SeqEngine.count_windows(windows)
+        list_seq.clear()
+        list_anchors.clear()
+        LogoMetrics.count("sequences", windows.shape[0])
+        LogoMetrics.count("windows_dropped", int((~kept).sum()))
+        return int((~kept).sum())
+
+    for seq, anchor in records:
+        list_seq.append(seq)
+        list_anchors.append(anchor)
+        if len(list_seq) >= batch_size:
+            n_removed += fold()
+    if list_seq:
+        n_removed += fold()
+    return counts, n_removed
+
+
+def fasta_counts(path_fasta: str, length_right: int, length_left: int, start_pos: bool = True,
+                 anchor_key: str = None, path_anchors: str = None, column_id: str = "id",
+                 column_anchor: str = "anchor", delimiter: str = "\t", batch_size: int = 4096):
+    """
+    Count matrix of a FASTA file without loading it, anchors from the headers (anchor_key=value) or from a
+    side table (path_anchors with the columns column_id and column_anchor)
+
+    Returns
+    _______
+    counts, n_removed : see count_stream
+    """
+    dict_anchors = None
+    if path_anchors is not None:
+        dict_anchors = read_anchor_table(path_anchors, column_id, column_anchor, delimiter=delimiter)
+    records = iter_fasta_anchored(path_fasta, anchor_key=anchor_key, dict_anchors=dict_anchors)
+    return count_stream(records, length_right, length_left, start_pos=start_pos, batch_size=batch_size)
+
+
+def table_counts(path_table: str, column_seq: str, column_anchor: str, length_right: int, length_left: int,
+                 start_pos: bool = True, delimiter: str = "\t", batch_size: int = 4096):
+    """
+    Count matrix of a TSV/CSV file without a pd.DataFrame
+
+    Returns
+    _______
+    counts, n_removed : see count_stream
+    """
+    records = iter_table(path_table, column_seq, column_anchor, delimiter=delimiter)
+    return count_stream(records, length_right, length_left, start_pos=start_pos, batch_size=batch_size)
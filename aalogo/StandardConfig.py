@@ -2,26 +2,21 @@
 import os
 import platform
 import pathlib
-import time
-from datetime import datetime
+import functools
+# intern
+from aalogo import LogoMetrics
 
 
 # benchmarking
 # ______________________________________________________________________________________________________________________
-# create a decorater function just because
 def timingmethod(func):
+    """
+    Times the decorated function as LogoMetrics span (named after the function), silent without metric sinks
+    """
+    @functools.wraps(func)
     def time_wrapper(*args, **kwargs):
-        start_now = datetime.now()
-        current_time = start_now.strftime("%H:%M:%S")
-        t0 = time.perf_counter()
-        print(f"Begin process {func.__name__}: ", current_time)
-        called_func = func(*args, **kwargs)            # actual function called here
-        end_now = datetime.now()
-        current_time = end_now.strftime("%H:%M:%S")
-        t1 = time.perf_counter()              # more accurate than time.time() --> is for telling you what time it is
-        print(f"End process {func.__name__}: ", current_time)
-        print(f"Process time: {round(t1-t0, 2)} seconds")
-        return called_func
+        with LogoMetrics.span(func.__name__):
+            return func(*args, **kwargs)            # actual function called here
     return time_wrapper
 
 
@@ -43,6 +38,28 @@ def find_folderpath():
     return path_file, sep
 
 
+def cache_directory(name_dir=None):
+    """
+    User cache directory of aalogo (AALOGO_CACHE_DIR, else XDG_CACHE_HOME/aalogo, LOCALAPPDATA on Windows,
+    ~/.cache/aalogo), created if missing
+
+    Parameters
+    __________
+    name_dir : optional sub directory
+    """
+    path_cache = os.environ.get("AALOGO_CACHE_DIR")
+    if not path_cache:
+        if platform.system() == 'Windows' and os.environ.get("LOCALAPPDATA"):
+            path_base = os.environ["LOCALAPPDATA"]
+        else:
+            path_base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+        path_cache = os.path.join(path_base, "aalogo")
+    if name_dir is not None:
+        path_cache = os.path.join(path_cache, name_dir)
+    os.makedirs(path_cache, exist_ok=True)
+    return path_cache
+
+
 def make_directory(name_dir, path_dir=None):
     """
     For Directory creation utility
@@ -63,5 +80,5 @@ def make_directory(name_dir, path_dir=None):
     if os.path.exists(path_name_dir):
         pass
     else:
-        os.mkdir(path_name_dir)
+        os.makedirs(path_name_dir, exist_ok=True)          # exist_ok: parallel workers may create it first
         print("Path " + str(path_name_dir) + " is created...")  # read files from target folder "input"
@@ -0,0 +1,73 @@
+# standard libs
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+
+# import time of the aalogo modules, every sample in a fresh interpreter (nothing cached in sys.modules)
+# ______________________________________________________________________________________________________________________
+MODULES = ["aalogo.AALogorizer", "aalogo.LogoBatch", "aalogo.LogoCounts", "aalogo.SeqStream",
+           "aalogo.ScaleRegistry", "aalogo.ConfigRegistry"]
+HEAVY = ["numpy", "pandas", "matplotlib", "PIL"]
+
+PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - t0
+print(json.dumps({{"seconds": seconds, "loaded": [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def measure(module: str, repeat: int = 7):
+    """
+    Returns
+    _______
+    dict_result : {"module", "median_ms", "min_ms", "loaded"} (heavy dependencies imported with the module)
+    """
+    path_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [path_root, os.environ.get("PYTHONPATH")]))}
+    list_seconds, loaded = [], []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)], env=env,
+                                check=True, capture_output=True, text=True).stdout
+        sample = json.loads(output.strip().splitlines()[-1])
+        list_seconds.append(sample["seconds"])
+        loaded = sample["loaded"]
+    return {"module": module, "median_ms": round(statistics.median(list_seconds) * 1000, 1),
+            "min_ms": round(min(list_seconds) * 1000, 1), "loaded": loaded}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="import time of the aalogo modules")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--json", dest="path_json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file of an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    dict_baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r") as file_json:
+            dict_baseline = {result["module"]: result for result in json.load(file_json)}
+
+    list_results = []
+    for module in args.modules:
+        result = measure(module, repeat=args.repeat)
+        list_results.append(result)
+        line = f"{module:<26} {result['median_ms']:>8.1f} ms   loads: {', '.join(result['loaded']) or '-'}"
+        if module in dict_baseline:
+            line += f"   (baseline {dict_baseline[module]['median_ms']:.1f} ms)"
+        print(line)
+
+    if args.path_json:
+        with open(args.path_json, "w") as file_json:
+            json.dump(list_results, file_json, indent=2)
+    return list_results
+
+
+if __name__ == "__main__":
+    main()
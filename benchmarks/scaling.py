@@ -0,0 +1,218 @@
+# standard libs
+import os
+import sys
+import json
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+
+
+# scaling of the logo pipeline (AAlogoMaker.single_mode) over sequence count, window width and render backend
+# ______________________________________________________________________________________________________________________
+# every case runs in a fresh interpreter: peak RSS belongs to one case and nothing is cached between cases
+# stage times are the LogoMetrics spans of single_mode ("count" = windows cut and counted by
+# SequenceCorpus.count_anchor_sets), the synthetic proteome is generated offline from a seed
+#   case   : {"n_sequences", "width", "backend", "file_format", "repeat", "seed", "length"}
+#   result : case + {"stages": {stage: median seconds}, "total", "sequences_per_s", "peak_rss_mb", "pipeline_rss_mb"}
+# reference results of the --quick grid: BASELINE (--baseline without file), the timings depend on the machine
+# (see its "environment") --> on other machines write an own reference with --json first
+SIZES = [1000, 10000, 100000, 1000000]
+WIDTHS = [2, 10, 40, 80]
+BACKENDS = ["artist", "raster", "vector"]
+STAGES = ["count", "colorize", "letters", "save"]
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scaling_quick.json")
+SEQ_LENGTH = (50, 500)
+
+# amino acid composition of UniProtKB/Swiss-Prot in SeqEngine code order (ACDEFGHIKLMNPQRSTVWY), percent
+AA_COMPOSITION = [8.25, 1.38, 5.46, 6.72, 3.86, 7.07, 2.27, 5.91, 5.80, 9.65,
+                  2.41, 4.06, 4.74, 3.93, 5.53, 6.64, 5.35, 6.86, 1.10, 2.92]
+
+
+def synthetic_proteome(n_sequences: int, seed: int = 0, length: tuple = SEQ_LENGTH, chunk_size: int = 1 << 24):
+    """
+    Random proteome with the Swiss-Prot amino acid composition, generated directly in the encoded form
+    (no sequence strings --> millions of sequences fit in memory)
+
+    Parameters
+    __________
+    n_sequences : number of sequences
+    seed : random seed, same seed --> same proteome
+    length : (shortest, longest) sequence length, uniformly distributed
+    chunk_size : residues drawn at once (bounds the temporary float arrays)
+
+    Returns
+    _______
+    corpus : SeqCorpus.SequenceCorpus
+    anchors : float64 array, one position per sequence between 1 and the sequence length
+    """
+    import numpy as np
+    from aalogo.SeqCorpus import SequenceCorpus
+
+    rng = np.random.default_rng(seed)
+    lengths = rng.integers(length[0], length[1] + 1, size=n_sequences)
+    offsets = np.zeros(n_sequences + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    cdf = np.cumsum(AA_COMPOSITION) / sum(AA_COMPOSITION)
+    buffer = np.empty(int(offsets[-1]), dtype=np.uint8)
+    for start in range(0, buffer.size, chunk_size):
+        stop = min(start + chunk_size, buffer.size)
+        buffer[start:stop] = np.searchsorted(cdf, rng.random(stop - start), side="right")
+    anchors = np.floor(rng.random(n_sequences) * lengths).astype(np.float64) + 1
+    return SequenceCorpus(buffer, offsets), anchors
+
+
+def _peak_rss_mb():
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024     # Linux: kB
+
+
+def run_case(case: dict):
+    """
+    Runs one case in this process (called in the fresh interpreter of measure())
+
+    Returns
+    _______
+    result : see module description
+    """
+    os.environ.setdefault("MPLBACKEND", "Agg")
+    from aalogo import LogoMetrics
+    from aalogo import RenderCache
+    from aalogo.AALogorizer import AAlogoMaker
+
+    RenderCache.disable()                       # every repeat draws the logo
+    corpus, anchors = synthetic_proteome(case["n_sequences"], seed=case["seed"], length=tuple(case["length"]))
+    corpus.anchors["anchor"] = anchors          # no pd.DataFrame, sequences and anchors from the corpus
+    length_left = case["width"] // 2
+    length_right = case["width"] - length_left
+    rss_ready = _peak_rss_mb()
+
+    sink = LogoMetrics.add_sink(LogoMetrics.MemorySink())
+    with tempfile.TemporaryDirectory() as path_output:
+        for _ in range(case["repeat"]):
+            maker = AAlogoMaker(None, "bench", "sequence", "anchor", corpus=corpus)
+            maker.single_mode(aa_right=length_right, aa_left=length_left, theme="Kyte-Doolittle",
+                              backend=case["backend"], file_format=case["file_format"], output_dir=path_output)
+    LogoMetrics.remove_sink(sink)
+
+    stages = {stage: round(statistics.median(event["seconds"] for event in sink.spans(stage)), 6)
+              for stage in STAGES}
+    total = statistics.median(event["seconds"] for event in sink.spans("single_mode"))
+    rss_peak = _peak_rss_mb()
+    return {**case, "stages": stages, "total": round(total, 6),
+            "sequences_per_s": round(case["n_sequences"] / max(stages["count"], 1e-9)),
+            "peak_rss_mb": round(rss_peak, 1), "pipeline_rss_mb": round(rss_peak - rss_ready, 1)}
+
+
+def measure(case: dict):
+    """
+    Runs one case in a fresh interpreter
+
+    Returns
+    _______
+    result : see module description
+    """
+    path_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [path_root, os.environ.get("PYTHONPATH")])),
+           "MPLBACKEND": "Agg"}
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), "--case", json.dumps(case)], env=env,
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def case_key(result: dict):
+    return f"n={result['n_sequences']} width={result['width']} backend={result['backend']}"
+
+
+def compare(result: dict, baseline: dict, tolerance: float, min_seconds: float):
+    """
+    Stages slower than the baseline by more than tolerance (relative) and min_seconds (absolute)
+
+    Returns
+    _______
+    list_regressions : [(stage, seconds, baseline seconds)]
+    """
+    list_regressions = []
+    pairs = [(stage, result["stages"][stage], baseline["stages"].get(stage)) for stage in STAGES]
+    pairs.append(("total", result["total"], baseline.get("total")))
+    for stage, seconds, seconds_base in pairs:
+        if seconds_base is None:
+            continue
+        if seconds > seconds_base * (1 + tolerance) and seconds - seconds_base > min_seconds:
+            list_regressions.append((stage, seconds, seconds_base))
+    return list_regressions
+
+
+def environment():
+    import numpy as np
+    import matplotlib
+
+    return {"python": platform.python_version(), "numpy": np.__version__, "matplotlib": matplotlib.__version__,
+            "machine": platform.machine(), "system": platform.system(), "cpus": os.cpu_count()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="scaling of the aalogo pipeline over sequence count, "
+                                                 "window width and render backend")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="numbers of sequences")
+    parser.add_argument("--widths", type=int, nargs="+", default=WIDTHS, help="window widths (left + right)")
+    parser.add_argument("--backends", nargs="+", default=BACKENDS, choices=BACKENDS)
+    parser.add_argument("--file-format", default="png")
+    parser.add_argument("--repeat", type=int, default=3, help="logos per case, stage times are medians")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--length", type=int, nargs=2, default=list(SEQ_LENGTH), metavar=("MIN", "MAX"),
+                        help="sequence length range of the synthetic proteome")
+    parser.add_argument("--quick", action="store_true", help="small grid (1k / 10k sequences, widths 2 / 10)")
+    parser.add_argument("--json", dest="path_json", help="write the results to this file")
+    parser.add_argument("--baseline", nargs="?", const=BASELINE,
+                        help="results file of an earlier run to compare against (without file: the shipped "
+                             "reference of the --quick grid)")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slow down per stage")
+    parser.add_argument("--min-seconds", type=float, default=0.005,
+                        help="slow downs below this absolute difference are ignored (timer noise)")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        print(json.dumps(run_case(json.loads(args.case))))
+        return 0
+    if args.quick:
+        args.sizes, args.widths = [1000, 10000], [2, 10]
+
+    dict_baseline = {}
+    if args.baseline:
+        with open(args.baseline, "r") as file_json:
+            dict_baseline = {case_key(result): result for result in json.load(file_json)["results"]}
+
+    list_results, n_regressions = [], 0
+    print(f"{'case':<36} " + " ".join(f"{stage:>9}" for stage in STAGES + ["total"]) + f" {'seq/s':>11} {'RSS MB':>7}")
+    for backend in args.backends:
+        for width in args.widths:
+            for n_sequences in args.sizes:
+                case = {"n_sequences": n_sequences, "width": width, "backend": backend,
+                        "file_format": args.file_format, "repeat": args.repeat, "seed": args.seed,
+                        "length": args.length}
+                result = measure(case)
+                list_results.append(result)
+                seconds = [result["stages"][stage] for stage in STAGES] + [result["total"]]
+                print(f"{case_key(result):<36} " + " ".join(f"{value:>9.4f}" for value in seconds) +
+                      f" {result['sequences_per_s']:>11,} {result['peak_rss_mb']:>7.1f}")
+                baseline = dict_baseline.get(case_key(result))
+                if baseline is not None:
+                    for stage, value, value_base in compare(result, baseline, args.tolerance, args.min_seconds):
+                        n_regressions += 1
+                        print(f"    REGRESSION {stage}: {value:.4f} s (baseline {value_base:.4f} s, "
+                              f"+{(value / value_base - 1) * 100:.0f} %)")
+
+    if args.path_json:
+        with open(args.path_json, "w") as file_json:
+            json.dump({"environment": environment(), "results": list_results}, file_json, indent=2)
+    if args.baseline:
+        print(f"{n_regressions} regressions against {args.baseline}")
+    return 1 if n_regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,20 @@
+# standard libs
+import pytest
+# intern
+from aalogo import LogoRender
+
+
+@pytest.mark.parametrize("font_type", list(LogoRender.VECTOR_FONTS))
+@pytest.mark.parametrize("aa", ["I", "l"])
+def test_narrow_letters_keep_their_width(font_type, aa):
+    # narrow outlines stay centered letters, not rectangles filling the whole position
+    extents = LogoRender.letter_path(aa, font_type).get_extents()
+    assert extents.y0 == pytest.approx(0) and extents.y1 == pytest.approx(1)
+    assert extents.x0 > 0.05 and extents.x1 < 0.95
+    assert (extents.x0 + extents.x1) / 2 == pytest.approx(0.5)
+
+
+@pytest.mark.parametrize("font_type", list(LogoRender.VECTOR_FONTS))
+def test_widest_letter_fills_the_position(font_type):
+    extents = LogoRender.letter_path("W", font_type).get_extents()
+    assert (extents.x0, extents.x1) == (pytest.approx(0), pytest.approx(1))